@@ -103,10 +103,12 @@ const uploadPath = path.join(dataPath, 'upload/');
 const sshdPath = path.join(dataPath, 'ssh.d/');
 const systemLogPath = path.join(dataPath, 'syslog/');
 const dependenceCachePath = path.join(dataPath, 'dep_cache/');
+const notifyMetricsFile = path.join(dataPath, 'notify/metrics.jsonl');
+const grpcSocketFile = path.join(configPath, 'grpc/api.sock');
 
 const envFile = path.join(preloadPath, 'env.sh');
 const jsEnvFile = path.join(preloadPath, 'env.js');
-const pyEnvFile = path.join(preloadPath, 'env.py');
+const envJsonFile = path.join(preloadPath, 'env.json');
 const jsNotifyFile = path.join(preloadPath, '__ql_notify__.js');
 const pyNotifyFile = path.join(preloadPath, '__ql_notify__.py');
 const langEnvFile = path.join(preloadPath, 'lang_env.sh');
@@ -148,7 +150,7 @@ export default {
   confFile,
   envFile,
   jsEnvFile,
-  pyEnvFile,
+  envJsonFile,
   jsNotifyFile,
   pyNotifyFile,
   langEnvFile,
@@ -167,6 +169,7 @@ export default {
     'env.sh',
     'env.js',
     'env.py',
+    'env.json',
     'token.json',
     'grpc',
     '__pycache__',
@@ -193,5 +196,7 @@ export default {
   sshdPath,
   systemLogPath,
   dependenceCachePath,
+  notifyMetricsFile,
+  grpcSocketFile,
   maxTokensPerPlatform: 10, // Maximum number of concurrent sessions per platform
 };
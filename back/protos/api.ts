@@ -11,7 +11,9 @@ import {
   ChannelCredentials,
   Client,
   type ClientOptions,
+  type ClientReadableStream,
   type ClientUnaryCall,
+  type handleServerStreamingCall,
   type handleUnaryCall,
   makeGenericClientConstructor,
   Metadata,
@@ -195,6 +197,10 @@ export interface UpdateEnvRequest {
   env: EnvItem | undefined;
 }
 
+export interface UpdateEnvsRequest {
+  envs: EnvItem[];
+}
+
 export interface DeleteEnvsRequest {
   ids: number[];
 }
@@ -289,6 +295,9 @@ export interface DeleteCronsRequest {
 
 export interface GetCronsRequest {
   searchValue?: string | undefined;
+  page?: number | undefined;
+  size?: number | undefined;
+  afterId?: number | undefined;
 }
 
 export interface GetCronByIdRequest {
@@ -311,6 +320,7 @@ export interface CronsResponse {
   code: number;
   data: CronItem[];
   message?: string | undefined;
+  total?: number | undefined;
 }
 
 export interface CronResponse {
@@ -329,6 +339,18 @@ export interface CronDetailResponse {
   message?: string | undefined;
 }
 
+export interface TailCronLogRequest {
+  id: number;
+  log_path: string;
+  offset: number;
+  follow: boolean;
+}
+
+export interface CronLogChunk {
+  data: Uint8Array;
+  offset: number;
+}
+
 export interface NotificationInfo {
   type: NotificationMode;
   gotifyUrl?: string | undefined;
@@ -729,6 +751,64 @@ export const UpdateEnvRequest: MessageFns<UpdateEnvRequest> = {
   },
 };
 
+function createBaseUpdateEnvsRequest(): UpdateEnvsRequest {
+  return { envs: [] };
+}
+
+export const UpdateEnvsRequest: MessageFns<UpdateEnvsRequest> = {
+  encode(message: UpdateEnvsRequest, writer: BinaryWriter = new BinaryWriter()): BinaryWriter {
+    for (const v of message.envs) {
+      EnvItem.encode(v!, writer.uint32(10).fork()).join();
+    }
+    return writer;
+  },
+
+  decode(input: BinaryReader | Uint8Array, length?: number): UpdateEnvsRequest {
+    const reader = input instanceof BinaryReader ? input : new BinaryReader(input);
+    let end = length === undefined ? reader.len : reader.pos + length;
+    const message = createBaseUpdateEnvsRequest();
+    while (reader.pos < end) {
+      const tag = reader.uint32();
+      switch (tag >>> 3) {
+        case 1: {
+          if (tag !== 10) {
+            break;
+          }
+
+          message.envs.push(EnvItem.decode(reader, reader.uint32()));
+          continue;
+        }
+      }
+      if ((tag & 7) === 4 || tag === 0) {
+        break;
+      }
+      reader.skip(tag & 7);
+    }
+    return message;
+  },
+
+  fromJSON(object: any): UpdateEnvsRequest {
+    return { envs: globalThis.Array.isArray(object?.envs) ? object.envs.map((e: any) => EnvItem.fromJSON(e)) : [] };
+  },
+
+  toJSON(message: UpdateEnvsRequest): unknown {
+    const obj: any = {};
+    if (message.envs?.length) {
+      obj.envs = message.envs.map((e) => EnvItem.toJSON(e));
+    }
+    return obj;
+  },
+
+  create<I extends Exact<DeepPartial<UpdateEnvsRequest>, I>>(base?: I): UpdateEnvsRequest {
+    return UpdateEnvsRequest.fromPartial(base ?? ({} as any));
+  },
+  fromPartial<I extends Exact<DeepPartial<UpdateEnvsRequest>, I>>(object: I): UpdateEnvsRequest {
+    const message = createBaseUpdateEnvsRequest();
+    message.envs = object.envs?.map((e) => EnvItem.fromPartial(e)) || [];
+    return message;
+  },
+};
+
 function createBaseDeleteEnvsRequest(): DeleteEnvsRequest {
   return { ids: [] };
 }
@@ -2236,7 +2316,7 @@ export const DeleteCronsRequest: MessageFns<DeleteCronsRequest> = {
 };
 
 function createBaseGetCronsRequest(): GetCronsRequest {
-  return { searchValue: undefined };
+  return { searchValue: undefined, page: undefined, size: undefined, afterId: undefined };
 }
 
 export const GetCronsRequest: MessageFns<GetCronsRequest> = {
@@ -2244,6 +2324,15 @@ export const GetCronsRequest: MessageFns<GetCronsRequest> = {
     if (message.searchValue !== undefined) {
       writer.uint32(10).string(message.searchValue);
     }
+    if (message.page !== undefined) {
+      writer.uint32(16).int32(message.page);
+    }
+    if (message.size !== undefined) {
+      writer.uint32(24).int32(message.size);
+    }
+    if (message.afterId !== undefined) {
+      writer.uint32(32).int32(message.afterId);
+    }
     return writer;
   },
 
@@ -2262,6 +2351,30 @@ export const GetCronsRequest: MessageFns<GetCronsRequest> = {
           message.searchValue = reader.string();
           continue;
         }
+        case 2: {
+          if (tag !== 16) {
+            break;
+          }
+
+          message.page = reader.int32();
+          continue;
+        }
+        case 3: {
+          if (tag !== 24) {
+            break;
+          }
+
+          message.size = reader.int32();
+          continue;
+        }
+        case 4: {
+          if (tag !== 32) {
+            break;
+          }
+
+          message.afterId = reader.int32();
+          continue;
+        }
       }
       if ((tag & 7) === 4 || tag === 0) {
         break;
@@ -2272,7 +2385,12 @@ export const GetCronsRequest: MessageFns<GetCronsRequest> = {
   },
 
   fromJSON(object: any): GetCronsRequest {
-    return { searchValue: isSet(object.searchValue) ? globalThis.String(object.searchValue) : undefined };
+    return {
+      searchValue: isSet(object.searchValue) ? globalThis.String(object.searchValue) : undefined,
+      page: isSet(object.page) ? globalThis.Number(object.page) : undefined,
+      size: isSet(object.size) ? globalThis.Number(object.size) : undefined,
+      afterId: isSet(object.afterId) ? globalThis.Number(object.afterId) : undefined,
+    };
   },
 
   toJSON(message: GetCronsRequest): unknown {
@@ -2280,6 +2398,15 @@ export const GetCronsRequest: MessageFns<GetCronsRequest> = {
     if (message.searchValue !== undefined) {
       obj.searchValue = message.searchValue;
     }
+    if (message.page !== undefined) {
+      obj.page = Math.round(message.page);
+    }
+    if (message.size !== undefined) {
+      obj.size = Math.round(message.size);
+    }
+    if (message.afterId !== undefined) {
+      obj.afterId = Math.round(message.afterId);
+    }
     return obj;
   },
 
@@ -2289,6 +2416,9 @@ export const GetCronsRequest: MessageFns<GetCronsRequest> = {
   fromPartial<I extends Exact<DeepPartial<GetCronsRequest>, I>>(object: I): GetCronsRequest {
     const message = createBaseGetCronsRequest();
     message.searchValue = object.searchValue ?? undefined;
+    message.page = object.page ?? undefined;
+    message.size = object.size ?? undefined;
+    message.afterId = object.afterId ?? undefined;
     return message;
   },
 };
@@ -2562,7 +2692,7 @@ export const RunCronsRequest: MessageFns<RunCronsRequest> = {
 };
 
 function createBaseCronsResponse(): CronsResponse {
-  return { code: 0, data: [], message: undefined };
+  return { code: 0, data: [], message: undefined, total: undefined };
 }
 
 export const CronsResponse: MessageFns<CronsResponse> = {
@@ -2576,6 +2706,9 @@ export const CronsResponse: MessageFns<CronsResponse> = {
     if (message.message !== undefined) {
       writer.uint32(26).string(message.message);
     }
+    if (message.total !== undefined) {
+      writer.uint32(32).int32(message.total);
+    }
     return writer;
   },
 
@@ -2610,6 +2743,14 @@ export const CronsResponse: MessageFns<CronsResponse> = {
           message.message = reader.string();
           continue;
         }
+        case 4: {
+          if (tag !== 32) {
+            break;
+          }
+
+          message.total = reader.int32();
+          continue;
+        }
       }
       if ((tag & 7) === 4 || tag === 0) {
         break;
@@ -2624,6 +2765,7 @@ export const CronsResponse: MessageFns<CronsResponse> = {
       code: isSet(object.code) ? globalThis.Number(object.code) : 0,
       data: globalThis.Array.isArray(object?.data) ? object.data.map((e: any) => CronItem.fromJSON(e)) : [],
       message: isSet(object.message) ? globalThis.String(object.message) : undefined,
+      total: isSet(object.total) ? globalThis.Number(object.total) : undefined,
     };
   },
 
@@ -2638,6 +2780,9 @@ export const CronsResponse: MessageFns<CronsResponse> = {
     if (message.message !== undefined) {
       obj.message = message.message;
     }
+    if (message.total !== undefined) {
+      obj.total = Math.round(message.total);
+    }
     return obj;
   },
 
@@ -2649,6 +2794,7 @@ export const CronsResponse: MessageFns<CronsResponse> = {
     message.code = object.code ?? 0;
     message.data = object.data?.map((e) => CronItem.fromPartial(e)) || [];
     message.message = object.message ?? undefined;
+    message.total = object.total ?? undefined;
     return message;
   },
 };
@@ -2895,6 +3041,190 @@ export const CronDetailResponse: MessageFns<CronDetailResponse> = {
   },
 };
 
+function createBaseTailCronLogRequest(): TailCronLogRequest {
+  return { id: 0, log_path: "", offset: 0, follow: false };
+}
+
+export const TailCronLogRequest: MessageFns<TailCronLogRequest> = {
+  encode(message: TailCronLogRequest, writer: BinaryWriter = new BinaryWriter()): BinaryWriter {
+    if (message.id !== 0) {
+      writer.uint32(8).int32(message.id);
+    }
+    if (message.log_path !== "") {
+      writer.uint32(18).string(message.log_path);
+    }
+    if (message.offset !== 0) {
+      writer.uint32(24).int64(message.offset);
+    }
+    if (message.follow !== false) {
+      writer.uint32(32).bool(message.follow);
+    }
+    return writer;
+  },
+
+  decode(input: BinaryReader | Uint8Array, length?: number): TailCronLogRequest {
+    const reader = input instanceof BinaryReader ? input : new BinaryReader(input);
+    let end = length === undefined ? reader.len : reader.pos + length;
+    const message = createBaseTailCronLogRequest();
+    while (reader.pos < end) {
+      const tag = reader.uint32();
+      switch (tag >>> 3) {
+        case 1: {
+          if (tag !== 8) {
+            break;
+          }
+
+          message.id = reader.int32();
+          continue;
+        }
+        case 2: {
+          if (tag !== 18) {
+            break;
+          }
+
+          message.log_path = reader.string();
+          continue;
+        }
+        case 3: {
+          if (tag !== 24) {
+            break;
+          }
+
+          message.offset = longToNumber(reader.int64());
+          continue;
+        }
+        case 4: {
+          if (tag !== 32) {
+            break;
+          }
+
+          message.follow = reader.bool();
+          continue;
+        }
+      }
+      if ((tag & 7) === 4 || tag === 0) {
+        break;
+      }
+      reader.skip(tag & 7);
+    }
+    return message;
+  },
+
+  fromJSON(object: any): TailCronLogRequest {
+    return {
+      id: isSet(object.id) ? globalThis.Number(object.id) : 0,
+      log_path: isSet(object.log_path) ? globalThis.String(object.log_path) : "",
+      offset: isSet(object.offset) ? globalThis.Number(object.offset) : 0,
+      follow: isSet(object.follow) ? globalThis.Boolean(object.follow) : false,
+    };
+  },
+
+  toJSON(message: TailCronLogRequest): unknown {
+    const obj: any = {};
+    if (message.id !== 0) {
+      obj.id = Math.round(message.id);
+    }
+    if (message.log_path !== "") {
+      obj.log_path = message.log_path;
+    }
+    if (message.offset !== 0) {
+      obj.offset = Math.round(message.offset);
+    }
+    if (message.follow !== false) {
+      obj.follow = message.follow;
+    }
+    return obj;
+  },
+
+  create<I extends Exact<DeepPartial<TailCronLogRequest>, I>>(base?: I): TailCronLogRequest {
+    return TailCronLogRequest.fromPartial(base ?? ({} as any));
+  },
+  fromPartial<I extends Exact<DeepPartial<TailCronLogRequest>, I>>(object: I): TailCronLogRequest {
+    const message = createBaseTailCronLogRequest();
+    message.id = object.id ?? 0;
+    message.log_path = object.log_path ?? "";
+    message.offset = object.offset ?? 0;
+    message.follow = object.follow ?? false;
+    return message;
+  },
+};
+
+function createBaseCronLogChunk(): CronLogChunk {
+  return { data: new Uint8Array(0), offset: 0 };
+}
+
+export const CronLogChunk: MessageFns<CronLogChunk> = {
+  encode(message: CronLogChunk, writer: BinaryWriter = new BinaryWriter()): BinaryWriter {
+    if (message.data.length !== 0) {
+      writer.uint32(10).bytes(message.data);
+    }
+    if (message.offset !== 0) {
+      writer.uint32(16).int64(message.offset);
+    }
+    return writer;
+  },
+
+  decode(input: BinaryReader | Uint8Array, length?: number): CronLogChunk {
+    const reader = input instanceof BinaryReader ? input : new BinaryReader(input);
+    let end = length === undefined ? reader.len : reader.pos + length;
+    const message = createBaseCronLogChunk();
+    while (reader.pos < end) {
+      const tag = reader.uint32();
+      switch (tag >>> 3) {
+        case 1: {
+          if (tag !== 10) {
+            break;
+          }
+
+          message.data = reader.bytes();
+          continue;
+        }
+        case 2: {
+          if (tag !== 16) {
+            break;
+          }
+
+          message.offset = longToNumber(reader.int64());
+          continue;
+        }
+      }
+      if ((tag & 7) === 4 || tag === 0) {
+        break;
+      }
+      reader.skip(tag & 7);
+    }
+    return message;
+  },
+
+  fromJSON(object: any): CronLogChunk {
+    return {
+      data: isSet(object.data) ? bytesFromBase64(object.data) : new Uint8Array(0),
+      offset: isSet(object.offset) ? globalThis.Number(object.offset) : 0,
+    };
+  },
+
+  toJSON(message: CronLogChunk): unknown {
+    const obj: any = {};
+    if (message.data.length !== 0) {
+      obj.data = base64FromBytes(message.data);
+    }
+    if (message.offset !== 0) {
+      obj.offset = Math.round(message.offset);
+    }
+    return obj;
+  },
+
+  create<I extends Exact<DeepPartial<CronLogChunk>, I>>(base?: I): CronLogChunk {
+    return CronLogChunk.fromPartial(base ?? ({} as any));
+  },
+  fromPartial<I extends Exact<DeepPartial<CronLogChunk>, I>>(object: I): CronLogChunk {
+    const message = createBaseCronLogChunk();
+    message.data = object.data ?? new Uint8Array(0);
+    message.offset = object.offset ?? 0;
+    return message;
+  },
+};
+
 function createBaseNotificationInfo(): NotificationInfo {
   return {
     type: 0,
@@ -4265,6 +4595,15 @@ export const ApiService = {
     responseSerialize: (value: EnvResponse) => Buffer.from(EnvResponse.encode(value).finish()),
     responseDeserialize: (value: Buffer) => EnvResponse.decode(value),
   },
+  updateEnvs: {
+    path: "/com.ql.api.Api/UpdateEnvs",
+    requestStream: false,
+    responseStream: false,
+    requestSerialize: (value: UpdateEnvsRequest) => Buffer.from(UpdateEnvsRequest.encode(value).finish()),
+    requestDeserialize: (value: Buffer) => UpdateEnvsRequest.decode(value),
+    responseSerialize: (value: EnvsResponse) => Buffer.from(EnvsResponse.encode(value).finish()),
+    responseDeserialize: (value: Buffer) => EnvsResponse.decode(value),
+  },
   deleteEnvs: {
     path: "/com.ql.api.Api/DeleteEnvs",
     requestStream: false,
@@ -4409,12 +4748,22 @@ export const ApiService = {
     responseSerialize: (value: Response) => Buffer.from(Response.encode(value).finish()),
     responseDeserialize: (value: Buffer) => Response.decode(value),
   },
+  tailCronLog: {
+    path: "/com.ql.api.Api/TailCronLog",
+    requestStream: false,
+    responseStream: true,
+    requestSerialize: (value: TailCronLogRequest) => Buffer.from(TailCronLogRequest.encode(value).finish()),
+    requestDeserialize: (value: Buffer) => TailCronLogRequest.decode(value),
+    responseSerialize: (value: CronLogChunk) => Buffer.from(CronLogChunk.encode(value).finish()),
+    responseDeserialize: (value: Buffer) => CronLogChunk.decode(value),
+  },
 } as const;
 
 export interface ApiServer extends UntypedServiceImplementation {
   getEnvs: handleUnaryCall<GetEnvsRequest, EnvsResponse>;
   createEnv: handleUnaryCall<CreateEnvRequest, EnvsResponse>;
   updateEnv: handleUnaryCall<UpdateEnvRequest, EnvResponse>;
+  updateEnvs: handleUnaryCall<UpdateEnvsRequest, EnvsResponse>;
   deleteEnvs: handleUnaryCall<DeleteEnvsRequest, Response>;
   moveEnv: handleUnaryCall<MoveEnvRequest, EnvResponse>;
   disableEnvs: handleUnaryCall<DisableEnvsRequest, Response>;
@@ -4431,6 +4780,7 @@ export interface ApiServer extends UntypedServiceImplementation {
   enableCrons: handleUnaryCall<EnableCronsRequest, Response>;
   disableCrons: handleUnaryCall<DisableCronsRequest, Response>;
   runCrons: handleUnaryCall<RunCronsRequest, Response>;
+  tailCronLog: handleServerStreamingCall<TailCronLogRequest, CronLogChunk>;
 }
 
 export interface ApiClient extends Client {
@@ -4479,6 +4829,21 @@ export interface ApiClient extends Client {
     options: Partial<CallOptions>,
     callback: (error: ServiceError | null, response: EnvResponse) => void,
   ): ClientUnaryCall;
+  updateEnvs(
+    request: UpdateEnvsRequest,
+    callback: (error: ServiceError | null, response: EnvsResponse) => void,
+  ): ClientUnaryCall;
+  updateEnvs(
+    request: UpdateEnvsRequest,
+    metadata: Metadata,
+    callback: (error: ServiceError | null, response: EnvsResponse) => void,
+  ): ClientUnaryCall;
+  updateEnvs(
+    request: UpdateEnvsRequest,
+    metadata: Metadata,
+    options: Partial<CallOptions>,
+    callback: (error: ServiceError | null, response: EnvsResponse) => void,
+  ): ClientUnaryCall;
   deleteEnvs(
     request: DeleteEnvsRequest,
     callback: (error: ServiceError | null, response: Response) => void,
@@ -4719,6 +5084,12 @@ export interface ApiClient extends Client {
     options: Partial<CallOptions>,
     callback: (error: ServiceError | null, response: Response) => void,
   ): ClientUnaryCall;
+  tailCronLog(request: TailCronLogRequest, options?: Partial<CallOptions>): ClientReadableStream<CronLogChunk>;
+  tailCronLog(
+    request: TailCronLogRequest,
+    metadata?: Metadata,
+    options?: Partial<CallOptions>,
+  ): ClientReadableStream<CronLogChunk>;
 }
 
 export const ApiClient = makeGenericClientConstructor(ApiService, "com.ql.api.Api") as unknown as {
@@ -4727,6 +5098,31 @@ export const ApiClient = makeGenericClientConstructor(ApiService, "com.ql.api.Ap
   serviceName: string;
 };
 
+function bytesFromBase64(b64: string): Uint8Array {
+  if ((globalThis as any).Buffer) {
+    return Uint8Array.from(globalThis.Buffer.from(b64, "base64"));
+  } else {
+    const bin = globalThis.atob(b64);
+    const arr = new Uint8Array(bin.length);
+    for (let i = 0; i < bin.length; ++i) {
+      arr[i] = bin.charCodeAt(i);
+    }
+    return arr;
+  }
+}
+
+function base64FromBytes(arr: Uint8Array): string {
+  if ((globalThis as any).Buffer) {
+    return globalThis.Buffer.from(arr).toString("base64");
+  } else {
+    const bin: string[] = [];
+    arr.forEach((byte) => {
+      bin.push(globalThis.String.fromCharCode(byte));
+    });
+    return globalThis.btoa(bin.join(""));
+  }
+}
+
 type Builtin = Date | Function | Uint8Array | string | number | boolean | undefined;
 
 export type DeepPartial<T> = T extends Builtin ? T
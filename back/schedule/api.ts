@@ -1,7 +1,14 @@
 import 'reflect-metadata';
 import { Container } from 'typedi';
 import EnvService from '../services/env';
-import { sendUnaryData, ServerUnaryCall } from '@grpc/grpc-js';
+import {
+  sendUnaryData,
+  ServerUnaryCall,
+  ServerWritableStream,
+  status,
+} from '@grpc/grpc-js';
+import * as fs from 'fs/promises';
+import path from 'path';
 import {
   CreateEnvRequest,
   CronItem,
@@ -18,6 +25,7 @@ import {
   SystemNotifyRequest,
   UpdateEnvNamesRequest,
   UpdateEnvRequest,
+  UpdateEnvsRequest,
 } from '../protos/api';
 import LoggerInstance from '../loaders/logger';
 import pick from 'lodash/pick';
@@ -36,8 +44,13 @@ import {
   EnableCronsRequest,
   DisableCronsRequest,
   RunCronsRequest,
+  TailCronLogRequest,
+  CronLogChunk,
 } from '../protos/api';
 import { NotificationInfo } from '../data/notify';
+import { Crontab, CrontabStatus } from '../data/cron';
+import config from '../config';
+import { logStreamManager } from '../shared/logStreamManager';
 
 Container.set('logger', LoggerInstance);
 
@@ -97,6 +110,38 @@ export const updateEnv = async (
   }
 };
 
+export const updateEnvs = async (
+  call: ServerUnaryCall<UpdateEnvsRequest, EnvsResponse>,
+  callback: sendUnaryData<EnvsResponse>,
+) => {
+  try {
+    if (!call.request.envs || call.request.envs.length === 0) {
+      return callback(null, {
+        code: 400,
+        data: [],
+        message: 'envs parameter is required',
+      });
+    }
+    if (call.request.envs.some((x) => !x.id)) {
+      return callback(null, {
+        code: 400,
+        data: [],
+        message: 'id parameter is required',
+      });
+    }
+
+    const envService = Container.get(EnvService);
+    const data = await envService.updateMany(
+      call.request.envs.map(
+        (x) => pick(x, ['id', 'name', 'value', 'remarks']) as EnvItem,
+      ),
+    );
+    callback(null, { code: 200, data });
+  } catch (e: any) {
+    callback(e);
+  }
+};
+
 export const deleteEnvs = async (
   call: ServerUnaryCall<DeleteEnvsRequest, Response>,
   callback: sendUnaryData<Response>,
@@ -336,18 +381,23 @@ export const getCrons = async (
 ) => {
   try {
     const cronService = Container.get(CronService);
+    const { searchValue, page, size, afterId } = call.request;
+    const paginated = !!page && !!size;
     const result = await cronService.crontabs({
-      searchValue: call.request.searchValue || '',
-      page: '0',
-      size: '0',
-      sorter: '',
+      searchValue: searchValue || '',
+      page: paginated ? String(page) : '0',
+      size: size ? String(size) : '0',
+      // 分页遍历时按 id 排序，避免任务状态变化导致翻页时顺序错乱
+      sorter: paginated ? JSON.stringify({ field: 'id', type: 'ASC' }) : '',
       filters: '',
       queryString: '',
+      afterId,
     });
     const data = result.data.map((x) => normalizeCronData(x as CronItem));
     callback(null, {
       code: 200,
       data: data.filter((x): x is CronItem => x !== undefined),
+      total: result.total,
     });
   } catch (e: any) {
     callback(null, {
@@ -442,3 +492,136 @@ export const runCrons = async (
     callback(e);
   }
 };
+
+// 单次读取并发送的日志块大小
+const LOG_CHUNK_SIZE = 64 * 1024;
+// 日志也可能由 task 命令直接写入，没有 logStreamManager 事件时按该间隔检查文件和任务状态
+const LOG_POLL_INTERVAL = 1000;
+
+export const tailCronLog = async (
+  call: ServerWritableStream<TailCronLogRequest, CronLogChunk>,
+) => {
+  const { id, log_path, follow } = call.request;
+  let offset = Math.max(Number(call.request.offset) || 0, 0);
+  let absolutePath = '';
+  let handle: fs.FileHandle | undefined;
+  let cancelled = false;
+  let wake: (() => void) | undefined;
+  let draining = false;
+
+  const onLog = ({ filePath }: { filePath: string }) => {
+    if (filePath === absolutePath && !draining) {
+      wake?.();
+    }
+  };
+  const onCancelled = () => {
+    cancelled = true;
+    wake?.();
+  };
+  // 等待客户端读取（drain）或日志更新，客户端取消时立即返回
+  const wait = (event?: 'drain') =>
+    new Promise<void>((resolve) => {
+      const done = () => {
+        clearTimeout(timer);
+        if (event) {
+          call.removeListener(event, done);
+        }
+        wake = undefined;
+        draining = false;
+        resolve();
+      };
+      const timer = event ? undefined : setTimeout(done, LOG_POLL_INTERVAL);
+      wake = done;
+      draining = !!event;
+      if (event) {
+        call.once(event, done);
+      }
+    });
+  const fail = (code: status, details: string) => {
+    const err: any = new Error(details);
+    err.code = code;
+    err.details = details;
+    call.emit('error', err);
+  };
+
+  call.on('cancelled', onCancelled);
+  try {
+    if (!id && !log_path) {
+      return fail(status.INVALID_ARGUMENT, 'id or log_path is required');
+    }
+    const cronService = Container.get(CronService);
+    const findCron = async (): Promise<Crontab | undefined> =>
+      id
+        ? cronService.getDb({ id }).catch(() => undefined)
+        : cronService.find({ log_path });
+
+    const cron = await findCron();
+    const relativePath = id ? cron?.log_path : log_path;
+    if (!relativePath) {
+      return fail(status.NOT_FOUND, `log of cron ${id || log_path} not found`);
+    }
+    absolutePath = path.resolve(config.logPath, relativePath);
+    if (!absolutePath.startsWith(config.logPath)) {
+      return fail(status.INVALID_ARGUMENT, 'invalid log_path');
+    }
+    // 不跟随时日志文件必须已存在，跟随时等待任务创建日志文件
+    if (!follow) {
+      handle = await fs.open(absolutePath, 'r').catch(() => undefined);
+      if (!handle) {
+        return fail(status.NOT_FOUND, `log file ${relativePath} not found`);
+      }
+    }
+
+    logStreamManager.on('write', onLog);
+    logStreamManager.on('close', onLog);
+    const buffer = Buffer.alloc(LOG_CHUNK_SIZE);
+    let finishing = !follow;
+    let lastCheck = Date.now();
+    while (!cancelled) {
+      if (!handle) {
+        handle = await fs.open(absolutePath, 'r').catch(() => undefined);
+      }
+      const { bytesRead } = handle
+        ? await handle.read(buffer, 0, LOG_CHUNK_SIZE, offset)
+        : { bytesRead: 0 };
+      if (bytesRead > 0) {
+        offset += bytesRead;
+        // 客户端读取慢时 write 返回 false，等缓冲区排空后再继续读取文件
+        const data = Buffer.from(buffer.subarray(0, bytesRead));
+        if (!call.write({ data, offset })) {
+          await wait('drain');
+        }
+        continue;
+      }
+      if (finishing) {
+        break;
+      }
+
+      // 任务结束或已开始写入新的日志文件时，读完当前文件后结束
+      if (Date.now() - lastCheck >= LOG_POLL_INTERVAL) {
+        lastCheck = Date.now();
+        const current = await findCron();
+        const running =
+          typeof current?.status === 'number' &&
+          [CrontabStatus.running, CrontabStatus.queued].includes(
+            current.status,
+          );
+        if (!running || current?.log_path !== relativePath) {
+          finishing = true;
+          continue;
+        }
+      }
+      await wait();
+    }
+    if (!cancelled) {
+      call.end();
+    }
+  } catch (e: any) {
+    fail(status.INTERNAL, e.message);
+  } finally {
+    call.removeListener('cancelled', onCancelled);
+    logStreamManager.removeListener('write', onLog);
+    logStreamManager.removeListener('close', onLog);
+    await handle?.close();
+  }
+};
@@ -516,6 +516,7 @@ export default class CronService {
     sorter: string;
     filters: string;
     queryString: string;
+    afterId?: number;
   }): Promise<{ data: Crontab[]; total: number }> {
     const searchText = params?.searchValue;
     const page = Number(params?.page || '0');
@@ -543,11 +544,20 @@ export default class CronService {
         order.unshift([field, type]);
       }
     }
+    // 传入 afterId 时按 id 升序返回其后的数据，翻页期间增删任务不会导致重复或遗漏
+    if (params?.afterId !== undefined) {
+      query = { [Op.and]: [query, { id: { [Op.gt]: params.afterId } }] };
+      order = [['id', 'ASC']];
+    }
     let condition: FindOptions<Crontab> = {
       where: query,
       order: order as Order,
     };
-    if (page && size) {
+    if (params?.afterId !== undefined) {
+      if (size) {
+        condition.limit = size;
+      }
+    } else if (page && size) {
       condition.offset = (page - 1) * size;
       condition.limit = size;
     }
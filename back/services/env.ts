@@ -1,4 +1,6 @@
 import groupBy from 'lodash/groupBy';
+import pickBy from 'lodash/pickBy';
+import { createHash } from 'crypto';
 import { FindOptions, Op } from 'sequelize';
 import { Inject, Service } from 'typedi';
 import winston from 'winston';
@@ -57,6 +59,34 @@ export default class EnvService {
     return newDoc;
   }
 
+  public async updateMany(payloads: Env[]): Promise<Env[]> {
+    const ids = payloads.map((x) => x.id!);
+    await sequelize.transaction(async (transaction) => {
+      const docs = await EnvModel.findAll({ where: { id: ids }, transaction });
+      const docMap = new Map<number, Env>();
+      for (const doc of docs) {
+        const env = doc.get({ plain: true });
+        docMap.set(env.id!, env);
+      }
+      for (const payload of payloads) {
+        const doc = docMap.get(payload.id!);
+        if (!doc) {
+          throw new Error(`Env ${JSON.stringify({ id: payload.id })} not found`);
+        }
+        const tab = new Env({
+          ...doc,
+          ...pickBy(payload, (v) => v !== undefined),
+        });
+        await EnvModel.update(
+          { ...tab },
+          { where: { id: payload.id }, transaction },
+        );
+      }
+    });
+    await this.set_envs();
+    return await this.find({ id: ids });
+  }
+
   private async updateDb(payload: Env): Promise<Env> {
     await EnvModel.update({ ...payload }, { where: { id: payload.id } });
     return await this.getDb({ id: payload.id });
@@ -245,7 +275,7 @@ export default class EnvService {
     const groups = groupBy(envs, 'name');
     let env_string = '';
     let js_env_string = '';
-    let py_env_string = 'import os\n';
+    const py_envs: Record<string, string> = {};
     for (const key in groups) {
       if (Object.prototype.hasOwnProperty.call(groups, key)) {
         const group = groups[key];
@@ -266,15 +296,18 @@ export default class EnvService {
             /\`/g,
             '\\`',
           )}\`;\n`;
-          py_env_string += `os.environ['${key}']='''${_env_value.replace(
-            /\'/g,
-            "\\'",
-          )}'''\n`;
+          py_envs[key] = group.map((x) => x.value).join('&');
         }
       }
     }
     await writeFileWithLock(config.envFile, env_string);
     await writeFileWithLock(config.jsEnvFile, js_env_string);
-    await writeFileWithLock(config.pyEnvFile, py_env_string);
+    // 首行为版本号，python 预加载据此判断是否可以直接使用缓存
+    const py_env_json = JSON.stringify(py_envs);
+    const py_env_version = createHash('md5').update(py_env_json).digest('hex');
+    await writeFileWithLock(
+      config.envJsonFile,
+      `${py_env_version}\n${py_env_json}`,
+    );
   }
 }
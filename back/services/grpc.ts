@@ -1,4 +1,6 @@
 import { Server, ServerCredentials } from '@grpc/grpc-js';
+import * as fs from 'fs/promises';
+import path from 'path';
 import { CronService } from '../protos/cron';
 import { HealthService } from '../protos/health';
 import { ApiService } from '../protos/api';
@@ -24,6 +26,22 @@ export class GrpcServerService {
     return `${host}:${port}`;
   }
 
+  private async bindUnixSocket(
+    bindAsync: (address: string, creds: ServerCredentials) => Promise<number>,
+  ) {
+    // 本机任务优先通过 unix socket 调用，省去 TCP 和 TLS 握手，访问权限由文件权限控制
+    const socketFile = config.grpcSocketFile;
+    try {
+      await fs.mkdir(path.dirname(socketFile), { recursive: true, mode: 0o700 });
+      await fs.rm(socketFile, { force: true });
+      await bindAsync(`unix:${socketFile}`, ServerCredentials.createInsecure());
+      await fs.chmod(socketFile, 0o600);
+      Logger.debug(`[boot] gRPC service started successfully on unix:${socketFile}`);
+    } catch (err) {
+      Logger.warn(`Failed to bind gRPC on unix:${socketFile}`, err);
+    }
+  }
+
   async initialize() {
     try {
       this.server.addService(HealthService, { check });
@@ -55,6 +73,7 @@ export class GrpcServerService {
             port: grpcPort.toString(),
             host
           });
+          await this.bindUnixSocket(bindAsync);
           return grpcPort;
         } catch (err) {
           lastError = err as Error;
@@ -80,6 +99,7 @@ export class GrpcServerService {
             resolve(null);
           });
         });
+        await fs.rm(config.grpcSocketFile, { force: true });
       }
     } catch (err) {
       Logger.error('Error while shutting down gRPC service:', err);
@@ -1,5 +1,7 @@
 import { performance } from 'perf_hooks';
+import fs from 'fs/promises';
 import Logger from '../loaders/logger';
+import config from '../config';
 
 interface Metric {
   name: string;
@@ -11,6 +13,7 @@ interface Metric {
 class MetricsService {
   private metrics: Metric[] = [];
   private static instance: MetricsService;
+  private notifyMetricsOffset = 0;
 
   private constructor() {
     // 定期清理旧数据
@@ -18,6 +21,13 @@ class MetricsService {
       const oneHourAgo = Date.now() - 3600000;
       this.metrics = this.metrics.filter(m => m.timestamp > oneHourAgo);
     }, 60000);
+
+    // 定期读取 python 任务推送通知写入的指标
+    setInterval(() => {
+      this.ingestNotifyMetrics().catch((error) => {
+        Logger.warn('读取推送指标失败:', error);
+      });
+    }, 60000);
   }
 
   static getInstance(): MetricsService {
@@ -56,6 +66,66 @@ class MetricsService {
     }
   }
 
+  // 增量读取 notify.py 追加的 metrics.jsonl，返回新增的记录数
+  async ingestNotifyMetrics(file = config.notifyMetricsFile) {
+    let size: number;
+    try {
+      size = (await fs.stat(file)).size;
+    } catch {
+      return 0;
+    }
+    // 文件被轮转后从头读取
+    if (size < this.notifyMetricsOffset) {
+      this.notifyMetricsOffset = 0;
+    }
+    if (size === this.notifyMetricsOffset) {
+      return 0;
+    }
+
+    const handle = await fs.open(file, 'r');
+    let text: string;
+    try {
+      const buffer = Buffer.alloc(size - this.notifyMetricsOffset);
+      await handle.read(buffer, 0, buffer.length, this.notifyMetricsOffset);
+      // 只处理完整的行，未写完的行留到下次
+      const end = buffer.lastIndexOf(0x0a);
+      if (end < 0) {
+        return 0;
+      }
+      this.notifyMetricsOffset += end + 1;
+      text = buffer.subarray(0, end).toString('utf8');
+    } finally {
+      await handle.close();
+    }
+
+    const oneHourAgo = Date.now() - 3600000;
+    let count = 0;
+    for (const line of text.split('\n')) {
+      if (!line) continue;
+      try {
+        const item = JSON.parse(line);
+        const timestamp = Math.round(item.ts * 1000);
+        if (!(timestamp > oneHourAgo)) continue;
+        this.metrics.push({
+          name: 'notify_channel',
+          value: item.latency_ms,
+          timestamp,
+          tags: {
+            channel: String(item.channel),
+            ok: String(item.ok),
+            status: String(item.status ?? ''),
+            error: item.error || '',
+            attempts: String(item.attempts),
+          },
+        });
+        count++;
+      } catch {
+        // 忽略损坏的行
+      }
+    }
+    return count;
+  }
+
   getMetrics(name?: string, tags?: Record<string, string>) {
     let filtered = this.metrics;
     
@@ -2,12 +2,19 @@ import { createWriteStream, WriteStream } from 'fs';
 import { EventEmitter } from 'events';
 
 /**
- * Manages write streams for log files to improve performance by avoiding repeated file opens
+ * Manages write streams for log files to improve performance by avoiding repeated file opens.
+ * Emits 'write' and 'close' with { filePath } so log tails can wake up without polling.
  */
 export class LogStreamManager extends EventEmitter {
   private streams: Map<string, WriteStream> = new Map();
   private pendingWrites: Map<string, Promise<void>> = new Map();
 
+  constructor() {
+    super();
+    // Every log tail subscribes to 'write' and 'close'
+    this.setMaxListeners(0);
+  }
+
   /**
    * Write data to a log file using a managed stream
    * @param filePath - Absolute path to the log file
@@ -62,6 +69,7 @@ export class LogStreamManager extends EventEmitter {
     } finally {
       this.pendingWrites.delete(filePath);
     }
+    this.emit('write', { filePath });
   }
 
   /**
@@ -82,6 +90,7 @@ export class LogStreamManager extends EventEmitter {
       return new Promise<void>((resolve) => {
         stream.end(() => {
           this.streams.delete(filePath);
+          this.emit('close', { filePath });
           resolve();
         });
       });
@@ -21,6 +21,10 @@ DiskWarn=90
 ## 设置定时任务执行的超时时间，例如1h，后缀"s"代表秒(默认值), "m"代表分, "h"代表小时, "d"代表天
 CommandTimeoutTime=""
 
+## 是否通过常驻进程启动 python 任务，常用模块只导入一次，每个任务 fork 出子进程运行，可缩短任务启动时间
+## 设置为 true 时启用，启动器不可用时自动回退到直接运行 python3
+PythonLauncher=""
+
 ## 在运行 task 命令时，随机延迟启动任务的最大延迟时间，如 RandomDelay="300" ，表示任务将在 1-300 秒内随机延迟一个秒数，然后再运行，取消延迟赋值为空
 RandomDelay=""
 
@@ -203,6 +207,8 @@ export SMTP_PASSWORD=""
 export SMTP_NAME=""
 ## smtp_email_to 填写 SMTP 收件邮箱，多个用英文;分隔，不填默认发给发件邮箱
 export SMTP_EMAIL_TO=""
+## smtp_batch 填写 true 时任务结束前通过同一连接统一发送，填写 digest 时合并为一封摘要邮件，不填则立即发送
+export SMTP_BATCH=""
 
 ## 17. PushMe
 ## 官方说明文档：https://push.i-i.me/
@@ -1,18 +1,28 @@
 #!/usr/bin/env python3
 # _*_ coding:utf-8 _*_
+import asyncio
+import atexit
 import base64
+import contextvars
 import hashlib
 import hmac
 import json
 import os
+import random
 import re
+import subprocess
+import sys
 import threading
 import time
 import urllib.parse
 import smtplib
+from collections.abc import MutableMapping
+from dataclasses import asdict, dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.header import Header
-from email.utils import formataddr
+from email.utils import formataddr, parsedate_to_datetime
+from types import MappingProxyType
 
 import requests
 
@@ -34,6 +44,8 @@ def print(text, *args, **kw):
 # fmt: off
 push_config = {
     'HITOKOTO': True,                  # 启用一言（随机句子）
+    'NOTIFY_DIGEST': '',               # 填写 true 时合并同一任务内的多次推送，在任务结束或达到阈值时统一发送
+    'NOTIFY_SPOOL': '',                # 填写 true 时推送先写入本地队列后立即返回，由后台进程通过各渠道发送；填写 panel 时交给面板的系统通知发送
 
     'BARK_PUSH': '',                    # bark IP 或设备码，例：https://api.day.app/DxHcxxxxxRxxxxxxcm/
     'BARK_ARCHIVE': '',                 # bark 推送是否存档
@@ -111,6 +123,7 @@ push_config = {
     'SMTP_EMAIL_TO': '',                # SMTP 收件邮箱，多个分号分隔，默认发给发件邮箱
     'SMTP_PASSWORD': '',                # SMTP 登录密码，也可能为特殊口令，视具体邮件服务商说明而定
     'SMTP_NAME': '',                    # SMTP 收发件人姓名，可随意填写
+    'SMTP_BATCH': '',                   # SMTP 批量模式，true 任务结束时统一发送，digest 合并为一封
 
     'PUSHME_KEY': '',                   # PushMe 的 PUSHME_KEY
     'PUSHME_URL': '',                   # PushMe 的 PUSHME_URL
@@ -155,6 +168,364 @@ for k in push_config:
         v = os.getenv(k)
         push_config[k] = v
 
+# 当前 send() 调用解析出的只读配置，未设置时使用默认配置
+_call_config = contextvars.ContextVar("notify_push_config", default=None)
+
+
+class PushConfig(MutableMapping):
+    """
+    读取时优先使用当前 send() 调用的配置，并发调用之间互不影响；
+    修改只作用于默认配置，并使已启用渠道的缓存失效。
+    """
+
+    def __init__(self, defaults: dict):
+        self.defaults = defaults
+
+    def current(self):
+        config = _call_config.get()
+        return self.defaults if config is None else config
+
+    def __getitem__(self, key):
+        return self.current()[key]
+
+    def __iter__(self):
+        return iter(self.current())
+
+    def __len__(self):
+        return len(self.current())
+
+    def __setitem__(self, key, value):
+        self.defaults[key] = value
+        config_changed()
+
+    def __delitem__(self, key):
+        del self.defaults[key]
+        config_changed()
+
+
+push_config = PushConfig(push_config)
+
+
+def resolve_config(ignore_default_config: bool, overrides: dict):
+    """
+    合并默认配置与本次调用传入的配置，结果只读。
+    """
+    if not overrides:
+        return push_config.defaults
+    if ignore_default_config:
+        return MappingProxyType(dict(overrides))  # 不使用从环境变量获取的配置
+    return MappingProxyType({**push_config.defaults, **overrides})
+
+
+def group_by_config(items: list) -> list:
+    """
+    把 (标题, 内容, 配置) 列表按配置分组，返回 [(配置, [(标题, 内容), ...]), ...]。
+    """
+    groups = []
+    for title, content, config in items:
+        for group_config, group in groups:
+            if group_config is config or group_config == config:
+                group.append((title, content))
+                break
+        else:
+            groups.append((config, [(title, content)]))
+    return groups
+
+
+# 默认的 (连接超时, 读取超时)，单位秒
+# 可通过 NOTIFY_CONNECT_TIMEOUT / NOTIFY_READ_TIMEOUT 调整
+DEFAULT_TIMEOUT = (
+    float(os.getenv("NOTIFY_CONNECT_TIMEOUT") or 5),
+    float(os.getenv("NOTIFY_READ_TIMEOUT") or 15),
+)
+
+# 个别渠道的超时设置，未列出的渠道使用 DEFAULT_TIMEOUT
+CHANNEL_TIMEOUTS = {
+    "telegram_bot": (10, 30),
+    "hitokoto": (2, 3),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    获取进程内共享的 HTTP 会话，多次 send() 之间复用连接。
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=16, pool_maxsize=16
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+# 各渠道默认的发送频率 (每秒补充的令牌数, 桶容量)，参考各平台公开的限制
+# telegram_bot: 同一会话每秒 1 条
+# dingding_bot / wecom_bot: 每个机器人每分钟 20 条
+# feishu_bot: 每个机器人每分钟 100 条，每秒 5 条
+# pushplus_bot: 每分钟 5 条左右，超出返回 429/999
+# 未列出的渠道不限速
+CHANNEL_RATE_LIMITS = {
+    "telegram_bot": (1, 3),
+    "dingding_bot": (20 / 60, 20),
+    "wecom_bot": (20 / 60, 20),
+    "feishu_bot": (100 / 60, 5),
+    "pushplus_bot": (5 / 60, 5),
+}
+
+# 各渠道单条消息的长度上限，合并后的内容超出时拆分为多条发送
+CHANNEL_MAX_LENGTH = {
+    "bark": 3000,
+    "dingding_bot": 18000,
+    "feishu_bot": 18000,
+    "qmsg_bot": 2000,
+    "telegram_bot": 4000,
+    "wecom_app": 2000,
+    "wecom_bot": 2000,
+}
+# 按 UTF-8 字节数限制长度的渠道
+BYTE_LENGTH_CHANNELS = {"bark", "wecom_app", "wecom_bot"}
+
+# 失败重试次数，仅对连接失败、429 和 5xx 重试，读取超时只重试幂等请求
+NOTIFY_RETRIES = int(os.getenv("NOTIFY_RETRIES") or 3)
+# 读取超时时服务端可能已经处理了请求，只有这些方法可以安全地重发
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# 指数退避的初始间隔与单次等待上限，单位秒
+RETRY_BACKOFF = 1
+RETRY_MAX_WAIT = 60
+# 不重试的渠道
+CHANNEL_RETRIES = {"hitokoto": 0}
+# 限速排队的最长等待时间，单位秒，超出时放弃本次发送
+NOTIFY_RATE_LIMIT_MAX_WAIT = float(os.getenv("NOTIFY_RATE_LIMIT_MAX_WAIT") or 30)
+
+
+class RateLimited(Exception):
+    """
+    渠道限速排队超过 NOTIFY_RATE_LIMIT_MAX_WAIT，本次未发送。
+    """
+
+
+class PushFailed(Exception):
+    """
+    渠道的服务端在响应中返回了失败，异常信息即输出到日志的内容。
+    """
+
+
+class TokenBucket:
+    """
+    令牌桶限速，令牌不足时等待，同一进程内的并发发送依次排队。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait: float = None):
+        """
+        预占一个令牌并返回需要等待的秒数，超过 max_wait 时不占用令牌并返回 None。
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0
+            if max_wait is not None and wait > max_wait:
+                return None
+            # 先预占令牌，等待期间其他请求会排在后面
+            self.tokens -= 1
+            return wait
+
+    def acquire(self, max_wait: float = None) -> bool:
+        """
+        获取一个令牌并阻塞等待，需要等待的时间超过 max_wait 时返回 False。
+        """
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(channel: str):
+    limit = CHANNEL_RATE_LIMITS.get(channel)
+    if not limit:
+        return None
+    with _buckets_lock:
+        if channel not in _buckets:
+            _buckets[channel] = TokenBucket(*limit)
+        return _buckets[channel]
+
+
+def retry_after(response: requests.Response):
+    """
+    解析 Retry-After 响应头，支持秒数和 HTTP 日期两种格式。
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ChannelResult:
+    """
+    单个渠道的一次推送结果。status 为最后一次 HTTP 响应码，error 为异常类名，
+    服务端在响应中返回失败时为 PushFailed。
+    """
+
+    channel: str
+    ok: bool = True
+    attempts: int = 0
+    latency: float = 0.0
+    status: int = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: str = None
+
+    def finish(self) -> None:
+        self.ok = self.error is None and (self.status is None or self.status < 400)
+
+
+@dataclass
+class SendResult:
+    """
+    send() 的返回值，queued 为 True 时消息已加入合并缓冲区，尚未发送。
+    """
+
+    title: str
+    channels: list = field(default_factory=list)
+    queued: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.channels)
+
+
+# 当前正在执行的渠道的推送结果，由 run_channel() 设置，http_request() 记录每次请求
+_channel_result = contextvars.ContextVar("notify_channel_result", default=None)
+# run_job() 已在事件循环中等到了令牌，http_request() 的第一次请求直接使用
+_reserved_token = contextvars.ContextVar("notify_reserved_token", default=False)
+
+
+def body_size(kwargs: dict) -> int:
+    data = kwargs.get("data")
+    if data is None and kwargs.get("json") is not None:
+        data = json.dumps(kwargs["json"])
+    if isinstance(data, dict):
+        data = urllib.parse.urlencode(data)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return len(data) if isinstance(data, bytes) else 0
+
+
+def http_request(channel: str, method: str, url: str, **kwargs) -> requests.Response:
+    """
+    通过共享会话发送请求，未指定 timeout 时使用渠道对应的超时设置。
+    按渠道限速，排队超过 NOTIFY_RATE_LIMIT_MAX_WAIT 时抛出 RateLimited。
+    连接失败、429 和 5xx 时按指数退避重试，优先遵循 Retry-After；
+    读取超时只重试幂等请求，避免服务端已收到的推送被重复发送。
+    """
+    kwargs.setdefault("timeout", CHANNEL_TIMEOUTS.get(channel, DEFAULT_TIMEOUT))
+    retries = CHANNEL_RETRIES.get(channel, NOTIFY_RETRIES)
+    bucket = get_bucket(channel)
+    result = _channel_result.get()
+    for attempt in range(retries + 1):
+        if bucket and _reserved_token.get():
+            _reserved_token.set(False)
+        elif bucket and not bucket.acquire(NOTIFY_RATE_LIMIT_MAX_WAIT):
+            raise RateLimited(
+                f"{channel} 限速排队超过 {NOTIFY_RATE_LIMIT_MAX_WAIT:g} 秒"
+            )
+        wait = None
+        if result is not None:
+            result.attempts += 1
+            result.bytes_sent += body_size(kwargs)
+        try:
+            response = get_session().request(method=method, url=url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if result is not None:
+                result.error = type(e).__name__
+            if attempt >= retries:
+                raise
+            if (
+                isinstance(e, requests.ReadTimeout)
+                and method.upper() not in IDEMPOTENT_METHODS
+            ):
+                raise
+        else:
+            if result is not None:
+                result.status = response.status_code
+                result.bytes_received += len(response.content or b"")
+                result.error = None
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            if attempt >= retries:
+                return response
+            wait = retry_after(response)
+        if wait is None:
+            wait = random.uniform(0, RETRY_BACKOFF * 2**attempt)
+        wait = min(wait, RETRY_MAX_WAIT)
+        print(f"{channel} 请求失败，{wait:.1f} 秒后第 {attempt + 1} 次重试")
+        time.sleep(wait)
+
+
+def http_get(channel: str, url: str, **kwargs) -> requests.Response:
+    return http_request(channel, "GET", url, **kwargs)
+
+
+def http_post(channel: str, url: str, data=None, **kwargs) -> requests.Response:
+    return http_request(channel, "POST", url, data=data, **kwargs)
+
+
+def data_path(*names: str):
+    """
+    获取青龙数据目录下 notify 缓存文件的路径，不在青龙环境中时返回 None。
+    """
+    data_dir = os.getenv("QL_DATA_DIR")
+    if not data_dir and os.getenv("QL_DIR"):
+        data_dir = os.path.join(os.getenv("QL_DIR"), "data")
+    if not data_dir or not os.path.isdir(data_dir):
+        return None
+    path = os.path.join(data_dir, "notify", *names)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def write_json_file(path: str, data) -> None:
+    """
+    原子写入 JSON 文件，仅当前用户可读写。
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
 
 def bark(title: str, content: str) -> None:
     """
@@ -190,14 +561,14 @@ def bark(title: str, content: str) -> None:
     ):
         data[bark_params.get(pair[0])] = pair[1]
     headers = {"Content-Type": "application/json;charset=utf-8"}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = http_post(
+        "bark", url=url, data=json.dumps(data), headers=headers, timeout=15
     ).json()
 
     if response["code"] == 200:
         print("bark 推送成功！")
     else:
-        print("bark 推送失败！")
+        raise PushFailed("bark 推送失败！")
 
 
 def console(title: str, content: str) -> None:
@@ -226,14 +597,14 @@ def dingding_bot(title: str, content: str) -> None:
     url = f'https://oapi.dingtalk.com/robot/send?access_token={push_config.get("DD_BOT_TOKEN")}&timestamp={timestamp}&sign={sign}'
     headers = {"Content-Type": "application/json;charset=utf-8"}
     data = {"msgtype": "text", "text": {"content": f"{title}\n\n{content}"}}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = http_post(
+        "dingding_bot", url=url, data=json.dumps(data), headers=headers, timeout=15
     ).json()
 
     if not response["errcode"]:
         print("钉钉机器人 推送成功！")
     else:
-        print("钉钉机器人 推送失败！")
+        raise PushFailed(f"钉钉机器人 推送失败！{response.get('errmsg')}")
 
 
 def feishu_bot(title: str, content: str) -> None:
@@ -260,12 +631,12 @@ def feishu_bot(title: str, content: str) -> None:
         data["timestamp"] = timestamp
         data["sign"] = sign
 
-    response = requests.post(url, data=json.dumps(data)).json()
+    response = http_post("feishu_bot", url, data=json.dumps(data)).json()
 
     if response.get("StatusCode") == 0 or response.get("code") == 0:
         print("飞书 推送成功！")
     else:
-        print("飞书 推送失败！错误信息如下：\n", response)
+        raise PushFailed(f"飞书 推送失败！错误信息如下：\n{response}")
 
 
 def go_cqhttp(title: str, content: str) -> None:
@@ -277,12 +648,12 @@ def go_cqhttp(title: str, content: str) -> None:
     print("go-cqhttp 服务启动")
 
     url = f'{push_config.get("GOBOT_URL")}?access_token={push_config.get("GOBOT_TOKEN")}&{push_config.get("GOBOT_QQ")}&message=标题:{title}\n内容:{content}'
-    response = requests.get(url).json()
+    response = http_get("go_cqhttp", url).json()
 
     if response["status"] == "ok":
         print("go-cqhttp 推送成功！")
     else:
-        print("go-cqhttp 推送失败！")
+        raise PushFailed("go-cqhttp 推送失败！")
 
 
 def gotify(title: str, content: str) -> None:
@@ -299,12 +670,12 @@ def gotify(title: str, content: str) -> None:
         "message": content,
         "priority": push_config.get("GOTIFY_PRIORITY"),
     }
-    response = requests.post(url, data=data).json()
+    response = http_post("gotify", url, data=data).json()
 
     if response.get("id"):
         print("gotify 推送成功！")
     else:
-        print("gotify 推送失败！")
+        raise PushFailed("gotify 推送失败！")
 
 
 def iGot(title: str, content: str) -> None:
@@ -318,12 +689,12 @@ def iGot(title: str, content: str) -> None:
     url = f'https://push.hellyw.com/{push_config.get("IGOT_PUSH_KEY")}'
     data = {"title": title, "content": content}
     headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    response = requests.post(url, data=data, headers=headers).json()
+    response = http_post("iGot", url, data=data, headers=headers).json()
 
     if response["ret"] == 0:
         print("iGot 推送成功！")
     else:
-        print(f'iGot 推送失败！{response["errMsg"]}')
+        raise PushFailed(f'iGot 推送失败！{response["errMsg"]}')
 
 
 def serverJ(title: str, content: str) -> None:
@@ -343,12 +714,12 @@ def serverJ(title: str, content: str) -> None:
     else:
         url = f'https://sctapi.ftqq.com/{push_config.get("PUSH_KEY")}.send'
 
-    response = requests.post(url, data=data).json()
+    response = http_post("serverJ", url, data=data).json()
 
     if response.get("errno") == 0 or response.get("code") == 0:
         print("serverJ 推送成功！")
     else:
-        print(f'serverJ 推送失败！错误码：{response["message"]}')
+        raise PushFailed(f'serverJ 推送失败！错误码：{response["message"]}')
 
 
 def pushdeer(title: str, content: str) -> None:
@@ -368,12 +739,12 @@ def pushdeer(title: str, content: str) -> None:
     if push_config.get("DEER_URL"):
         url = push_config.get("DEER_URL")
 
-    response = requests.post(url, data=data).json()
+    response = http_post("pushdeer", url, data=data).json()
 
     if len(response.get("content").get("result")) > 0:
         print("PushDeer 推送成功！")
     else:
-        print("PushDeer 推送失败！错误信息：", response)
+        raise PushFailed(f"PushDeer 推送失败！错误信息：{response}")
 
 
 def chat(title: str, content: str) -> None:
@@ -385,12 +756,12 @@ def chat(title: str, content: str) -> None:
     print("chat 服务启动")
     data = "payload=" + json.dumps({"text": title + "\n" + content})
     url = push_config.get("CHAT_URL") + push_config.get("CHAT_TOKEN")
-    response = requests.post(url, data=data)
+    response = http_post("chat", url, data=data)
 
     if response.status_code == 200:
         print("Chat 推送成功！")
     else:
-        print("Chat 推送失败！错误信息：", response)
+        raise PushFailed(f"Chat 推送失败！错误信息：{response}")
 
 
 def pushplus_bot(title: str, content: str) -> None:
@@ -415,7 +786,9 @@ def pushplus_bot(title: str, content: str) -> None:
     }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = http_post(
+        "pushplus_bot", url=url, data=body, headers=headers
+    ).json()
 
     code = response["code"]
     if code == 200:
@@ -424,18 +797,20 @@ def pushplus_bot(title: str, content: str) -> None:
             "注意：请求成功并不代表推送成功，如未收到消息，请到pushplus官网使用流水号查询推送最终结果"
         )
     elif code == 900 or code == 903 or code == 905 or code == 999:
-        print(response["msg"])
+        raise PushFailed(response["msg"])
 
     else:
         url_old = "http://pushplus.hxtrip.com/send"
         headers["Accept"] = "application/json"
-        response = requests.post(url=url_old, data=body, headers=headers).json()
+        response = http_post(
+            "pushplus_bot", url=url_old, data=body, headers=headers
+        ).json()
 
         if response["code"] == 200:
             print("PUSHPLUS(hxtrip) 推送成功！")
 
         else:
-            print("PUSHPLUS 推送失败！")
+            raise PushFailed("PUSHPLUS 推送失败！")
 
 
 def weplus_bot(title: str, content: str) -> None:
@@ -461,12 +836,12 @@ def weplus_bot(title: str, content: str) -> None:
     }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = http_post("weplus_bot", url=url, data=body, headers=headers).json()
 
     if response["code"] == 200:
         print("微加机器人 推送成功！")
     else:
-        print("微加机器人 推送失败！")
+        raise PushFailed("微加机器人 推送失败！")
 
 
 def qmsg_bot(title: str, content: str) -> None:
@@ -479,12 +854,12 @@ def qmsg_bot(title: str, content: str) -> None:
 
     url = f'https://qmsg.zendee.cn/{push_config.get("QMSG_TYPE")}/{push_config.get("QMSG_KEY")}'
     payload = {"msg": f'{title}\n\n{content.replace("----", "-")}'.encode("utf-8")}
-    response = requests.post(url=url, params=payload).json()
+    response = http_post("qmsg_bot", url=url, params=payload).json()
 
     if response["code"] == 0:
         print("qmsg 推送成功！")
     else:
-        print(f'qmsg 推送失败！{response["reason"]}')
+        raise PushFailed(f'qmsg 推送失败！{response["reason"]}')
 
 
 def wecom_app(title: str, content: str) -> None:
@@ -518,7 +893,17 @@ def wecom_app(title: str, content: str) -> None:
     if response == "ok":
         print("企业微信推送成功！")
     else:
-        print("企业微信推送失败！错误信息如下：\n", response)
+        raise PushFailed(f"企业微信推送失败！错误信息如下：\n{response}")
+
+
+# access_token 提前过期的秒数，避免临界时刻使用即将失效的 token
+WECOM_TOKEN_MARGIN = 300
+# access_token 失效时企业微信返回的错误码
+WECOM_TOKEN_ERRCODES = (40001, 40014, 42001)
+WECOM_TOKEN_FILE = "wecom_token.json"
+
+_wecom_tokens = {}
+_wecom_lock = threading.Lock()
 
 
 class WeCom:
@@ -529,21 +914,80 @@ class WeCom:
         self.ORIGIN = "https://qyapi.weixin.qq.com"
         if push_config.get("QYWX_ORIGIN"):
             self.ORIGIN = push_config.get("QYWX_ORIGIN")
+        self.cache_key = hashlib.sha256(
+            f"{self.ORIGIN}|{self.CORPID}|{self.CORPSECRET}".encode("utf-8")
+        ).hexdigest()
 
-    def get_access_token(self):
+    def fetch_access_token(self):
         url = f"{self.ORIGIN}/cgi-bin/gettoken"
         values = {
             "corpid": self.CORPID,
             "corpsecret": self.CORPSECRET,
         }
-        req = requests.post(url, params=values)
+        req = http_post("wecom_app", url, params=values)
         data = json.loads(req.text)
-        return data["access_token"]
+        return data["access_token"], int(data.get("expires_in") or 7200)
+
+    def load_token_file(self) -> dict:
+        path = data_path(WECOM_TOKEN_FILE)
+        if not path or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_token_file(self, token: str, expires_at: float) -> None:
+        path = data_path(WECOM_TOKEN_FILE)
+        if not path:
+            return
+        tokens = {
+            key: item
+            for key, item in self.load_token_file().items()
+            if item.get("expires_at", 0) > time.time()
+        }
+        tokens[self.cache_key] = {"token": token, "expires_at": expires_at}
+        try:
+            write_json_file(path, tokens)
+        except OSError as e:
+            print(f"企业微信 access_token 缓存写入失败：{e}")
+
+    def get_access_token(self, refresh: bool = False):
+        """
+        获取 access_token，按 expires_in 在进程内和数据目录下缓存。
+        """
+        with _wecom_lock:
+            if not refresh:
+                item = _wecom_tokens.get(self.cache_key)
+                if not item:
+                    item = self.load_token_file().get(self.cache_key)
+                if item and item.get("expires_at", 0) > time.time():
+                    _wecom_tokens[self.cache_key] = item
+                    return item["token"]
+
+            token, expires_in = self.fetch_access_token()
+            expires_at = time.time() + max(expires_in - WECOM_TOKEN_MARGIN, 0)
+            _wecom_tokens[self.cache_key] = {"token": token, "expires_at": expires_at}
+            self.save_token_file(token, expires_at)
+            return token
+
+    def post_message(self, send_values: dict):
+        """
+        发送应用消息，access_token 失效时刷新后重试一次。
+        """
+        send_msges = bytes(json.dumps(send_values), "utf-8")
+        for refresh in (False, True):
+            send_url = (
+                f"{self.ORIGIN}/cgi-bin/message/send"
+                f"?access_token={self.get_access_token(refresh)}"
+            )
+            respone = http_post("wecom_app", send_url, send_msges).json()
+            if respone.get("errcode") not in WECOM_TOKEN_ERRCODES:
+                break
+        return respone["errmsg"]
 
     def send_text(self, message, touser="@all"):
-        send_url = (
-            f"{self.ORIGIN}/cgi-bin/message/send?access_token={self.get_access_token()}"
-        )
         send_values = {
             "touser": touser,
             "msgtype": "text",
@@ -551,15 +995,9 @@ class WeCom:
             "text": {"content": message},
             "safe": "0",
         }
-        send_msges = bytes(json.dumps(send_values), "utf-8")
-        respone = requests.post(send_url, send_msges)
-        respone = respone.json()
-        return respone["errmsg"]
+        return self.post_message(send_values)
 
     def send_mpnews(self, title, message, media_id, touser="@all"):
-        send_url = (
-            f"{self.ORIGIN}/cgi-bin/message/send?access_token={self.get_access_token()}"
-        )
         send_values = {
             "touser": touser,
             "msgtype": "mpnews",
@@ -577,10 +1015,7 @@ class WeCom:
                 ]
             },
         }
-        send_msges = bytes(json.dumps(send_values), "utf-8")
-        respone = requests.post(send_url, send_msges)
-        respone = respone.json()
-        return respone["errmsg"]
+        return self.post_message(send_values)
 
 
 def wecom_bot(title: str, content: str) -> None:
@@ -598,14 +1033,14 @@ def wecom_bot(title: str, content: str) -> None:
     url = f"{origin}/cgi-bin/webhook/send?key={push_config.get('QYWX_KEY')}"
     headers = {"Content-Type": "application/json;charset=utf-8"}
     data = {"msgtype": "text", "text": {"content": f"{title}\n\n{content}"}}
-    response = requests.post(
-        url=url, data=json.dumps(data), headers=headers, timeout=15
+    response = http_post(
+        "wecom_bot", url=url, data=json.dumps(data), headers=headers, timeout=15
     ).json()
 
     if response["errcode"] == 0:
         print("企业微信机器人推送成功！")
     else:
-        print("企业微信机器人推送失败！")
+        raise PushFailed(f"企业微信机器人推送失败！{response.get('errmsg')}")
 
 
 def telegram_bot(title: str, content: str) -> None:
@@ -630,26 +1065,19 @@ def telegram_bot(title: str, content: str) -> None:
     }
     proxies = None
     if push_config.get("TG_PROXY_HOST") and push_config.get("TG_PROXY_PORT"):
-        if push_config.get("TG_PROXY_AUTH") is not None and "@" not in push_config.get(
-            "TG_PROXY_HOST"
-        ):
-            push_config["TG_PROXY_HOST"] = (
-                push_config.get("TG_PROXY_AUTH")
-                + "@"
-                + push_config.get("TG_PROXY_HOST")
-            )
-        proxyStr = "http://{}:{}".format(
-            push_config.get("TG_PROXY_HOST"), push_config.get("TG_PROXY_PORT")
-        )
+        proxy_host = push_config.get("TG_PROXY_HOST")
+        if push_config.get("TG_PROXY_AUTH") is not None and "@" not in proxy_host:
+            proxy_host = push_config.get("TG_PROXY_AUTH") + "@" + proxy_host
+        proxyStr = "http://{}:{}".format(proxy_host, push_config.get("TG_PROXY_PORT"))
         proxies = {"http": proxyStr, "https": proxyStr}
-    response = requests.post(
-        url=url, headers=headers, params=payload, proxies=proxies
+    response = http_post(
+        "telegram_bot", url=url, headers=headers, params=payload, proxies=proxies
     ).json()
 
     if response["ok"]:
         print("tg 推送成功！")
     else:
-        print("tg 推送失败！")
+        raise PushFailed(f"tg 推送失败！{response.get('description')}")
 
 
 def aibotk(title: str, content: str) -> None:
@@ -680,28 +1108,69 @@ def aibotk(title: str, content: str) -> None:
         }
     body = json.dumps(data).encode(encoding="utf-8")
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, data=body, headers=headers).json()
+    response = http_post("aibotk", url=url, data=body, headers=headers).json()
     print(response)
     if response["code"] == 0:
         print("智能微秘书 推送成功！")
     else:
-        print(f'智能微秘书 推送失败！{response["error"]}')
+        raise PushFailed(f'智能微秘书 推送失败！{response["error"]}')
 
 
-def smtp(title: str, content: str) -> None:
+_smtp_server = None
+_smtp_key = None
+_smtp_lock = threading.Lock()
+_smtp_batch = []
+
+
+def close_smtp_server() -> None:
+    global _smtp_server
+    if _smtp_server is not None:
+        try:
+            _smtp_server.quit()
+        except Exception:
+            pass
+        _smtp_server = None
+
+
+atexit.register(close_smtp_server)
+
+
+def get_smtp_server() -> smtplib.SMTP:
     """
-    使用 SMTP 邮件 推送消息。
+    获取复用的 SMTP 连接，配置变化或 NOOP 检查失败时重新连接登录。
+    调用方需持有 _smtp_lock。
     """
-    if (
-        not push_config.get("SMTP_SERVER")
-        or not push_config.get("SMTP_SSL")
-        or not push_config.get("SMTP_EMAIL")
-        or not push_config.get("SMTP_PASSWORD")
-        or not push_config.get("SMTP_NAME")
-    ):
-        return
-    print("SMTP 邮件 服务启动")
+    global _smtp_server, _smtp_key
+    key = (
+        push_config.get("SMTP_SERVER"),
+        push_config.get("SMTP_SSL"),
+        push_config.get("SMTP_EMAIL"),
+        push_config.get("SMTP_PASSWORD"),
+    )
+    if _smtp_server is not None:
+        if _smtp_key == key:
+            try:
+                if _smtp_server.noop()[0] == 250:
+                    return _smtp_server
+            except (smtplib.SMTPException, OSError):
+                pass
+        close_smtp_server()
+
+    timeout = CHANNEL_TIMEOUTS.get("smtp", DEFAULT_TIMEOUT)[1]
+    server = (
+        smtplib.SMTP_SSL(push_config.get("SMTP_SERVER"), timeout=timeout)
+        if push_config.get("SMTP_SSL") == "true"
+        else smtplib.SMTP(push_config.get("SMTP_SERVER"), timeout=timeout)
+    )
+    server.login(push_config.get("SMTP_EMAIL"), push_config.get("SMTP_PASSWORD"))
+    _smtp_server, _smtp_key = server, key
+    return server
+
 
+def smtp_sendmail(title: str, content: str) -> None:
+    """
+    通过复用的 SMTP 连接发送一封邮件，连接被服务端断开时重连一次。
+    """
     email_to = push_config.get("SMTP_EMAIL_TO") or push_config.get("SMTP_EMAIL")
     email_to_list = [
         item.strip() for item in re.split(r"[;；]", email_to) if item.strip()
@@ -716,24 +1185,77 @@ def smtp(title: str, content: str) -> None:
     message["To"] = ",".join(email_to_list)
     message["Subject"] = Header(title, "utf-8")
 
+    with _smtp_lock:
+        for retry in (False, True):
+            try:
+                get_smtp_server().sendmail(
+                    push_config.get("SMTP_EMAIL"),
+                    email_to_list,
+                    message.as_bytes(),
+                )
+                return
+            except smtplib.SMTPServerDisconnected:
+                close_smtp_server()
+                if retry:
+                    raise
+
+
+def flush_smtp_batch() -> None:
+    """
+    退出时发送批量模式下积累的邮件，SMTP_BATCH=digest 时合并为一封。
+    """
+    with _smtp_lock:
+        batch = _smtp_batch[:]
+        _smtp_batch.clear()
+
+    for config, items in group_by_config(batch):
+        token = _call_config.set(config)
+        try:
+            if push_config.get("SMTP_BATCH") == "digest" and len(items) > 1:
+                title = f"{items[0][0]} 等 {len(items)} 条通知"
+                content = "\n\n".join(f"【{t}】\n{c}" for t, c in items)
+                items = [(title, content)]
+
+            for title, content in items:
+                try:
+                    smtp_sendmail(title, content)
+                    print(f"SMTP 邮件 {title} 推送成功！")
+                except Exception as e:
+                    print(f"SMTP 邮件 {title} 推送失败！{e}")
+        finally:
+            _call_config.reset(token)
+    with _smtp_lock:
+        close_smtp_server()
+
+
+def smtp(title: str, content: str) -> None:
+    """
+    使用 SMTP 邮件 推送消息。
+    SMTP_BATCH=true 时在退出前通过同一连接依次发送，=digest 时合并为一封摘要邮件。
+    """
+    if (
+        not push_config.get("SMTP_SERVER")
+        or not push_config.get("SMTP_SSL")
+        or not push_config.get("SMTP_EMAIL")
+        or not push_config.get("SMTP_PASSWORD")
+        or not push_config.get("SMTP_NAME")
+    ):
+        return
+    print("SMTP 邮件 服务启动")
+
+    if push_config.get("SMTP_BATCH") in ("true", "digest"):
+        with _smtp_lock:
+            if not _smtp_batch:
+                atexit.register(flush_smtp_batch)
+            _smtp_batch.append((title, content, push_config.current()))
+        print("SMTP 邮件 已加入批量发送队列，将在任务结束时发送")
+        return
+
     try:
-        smtp_server = (
-            smtplib.SMTP_SSL(push_config.get("SMTP_SERVER"))
-            if push_config.get("SMTP_SSL") == "true"
-            else smtplib.SMTP(push_config.get("SMTP_SERVER"))
-        )
-        smtp_server.login(
-            push_config.get("SMTP_EMAIL"), push_config.get("SMTP_PASSWORD")
-        )
-        smtp_server.sendmail(
-            push_config.get("SMTP_EMAIL"),
-            email_to_list,
-            message.as_bytes(),
-        )
-        smtp_server.close()
+        smtp_sendmail(title, content)
         print("SMTP 邮件 推送成功！")
     except Exception as e:
-        print(f"SMTP 邮件 推送失败！{e}")
+        raise PushFailed(f"SMTP 邮件 推送失败！{e}") from e
 
 
 def pushme(title: str, content: str) -> None:
@@ -756,12 +1278,12 @@ def pushme(title: str, content: str) -> None:
         "date": push_config.get("date") if push_config.get("date") else "",
         "type": push_config.get("type") if push_config.get("type") else "",
     }
-    response = requests.post(url, data=data)
+    response = http_post("pushme", url, data=data)
 
     if response.status_code == 200 and response.text == "success":
         print("PushMe 推送成功！")
     else:
-        print(f"PushMe 推送失败！{response.status_code} {response.text}")
+        raise PushFailed(f"PushMe 推送失败！{response.status_code} {response.text}")
 
 
 def chronocat(title: str, content: str) -> None:
@@ -786,6 +1308,7 @@ def chronocat(title: str, content: str) -> None:
         "Authorization": f'Bearer {push_config.get("CHRONOCAT_TOKEN")}',
     }
 
+    failed = False
     for chat_type, ids in [(1, user_ids), (2, group_ids)]:
         if not ids:
             continue
@@ -799,17 +1322,22 @@ def chronocat(title: str, content: str) -> None:
                     }
                 ],
             }
-            response = requests.post(url, headers=headers, data=json.dumps(data))
+            response = http_post(
+                "chronocat", url, headers=headers, data=json.dumps(data)
+            )
             if response.status_code == 200:
                 if chat_type == 1:
                     print(f"QQ个人消息:{ids}推送成功！")
                 else:
                     print(f"QQ群消息:{ids}推送成功！")
             else:
+                failed = True
                 if chat_type == 1:
                     print(f"QQ个人消息:{ids}推送失败！")
                 else:
                     print(f"QQ群消息:{ids}推送失败！")
+    if failed:
+        raise PushFailed("CHRONOCAT 推送失败！")
 
 
 def ntfy(title: str, content: str) -> None:
@@ -846,11 +1374,11 @@ def ntfy(title: str, content: str) -> None:
         headers['Actions'] = encode_rfc2047(push_config.get("NTFY_ACTIONS"))
 
     url = push_config.get("NTFY_URL") + "/" + push_config.get("NTFY_TOPIC")
-    response = requests.post(url, data=data, headers=headers)
+    response = http_post("ntfy", url, data=data, headers=headers)
     if response.status_code == 200:  # 使用 response.status_code 进行检查
         print("Ntfy 推送成功！")
     else:
-        print("Ntfy 推送失败！错误信息：", response.text)
+        raise PushFailed(f"Ntfy 推送失败！错误信息：{response.text}")
 
 
 def wxpusher_bot(title: str, content: str) -> None:
@@ -901,12 +1429,14 @@ def wxpusher_bot(title: str, content: str) -> None:
     }
 
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, json=data, headers=headers).json()
+    response = http_post(
+        "wxpusher_bot", url=url, json=data, headers=headers
+    ).json()
 
     if response.get("code") == 1000:
         print("wxpusher 推送成功！")
     else:
-        print(f"wxpusher 推送失败！错误信息：{response.get('msg')}")
+        raise PushFailed(f"wxpusher 推送失败！错误信息：{response.get('msg')}")
 
 
 def wxpusher_spt(title: str, content: str) -> None:
@@ -948,12 +1478,14 @@ def wxpusher_spt(title: str, content: str) -> None:
         data["sptList"] = spts
 
     headers = {"Content-Type": "application/json"}
-    response = requests.post(url=url, json=data, headers=headers).json()
+    response = http_post(
+        "wxpusher_spt", url=url, json=data, headers=headers
+    ).json()
 
     if response.get("code") == 1000:
         print("wxpusher SPT 推送成功！")
     else:
-        print(f"wxpusher SPT 推送失败！错误信息：{response.get('msg')}")
+        raise PushFailed(f"wxpusher SPT 推送失败！错误信息：{response.get('msg')}")
 
 
 def openilink(title: str, content: str) -> None:
@@ -985,12 +1517,12 @@ def openilink(title: str, content: str) -> None:
     if push_config.get("OPENILINK_CONTEXT_TOKEN"):
         data["context_token"] = push_config.get("OPENILINK_CONTEXT_TOKEN")
 
-    response = requests.post(url=url, json=data, headers=headers).json()
+    response = http_post("openilink", url=url, json=data, headers=headers).json()
 
     if response.get("ok"):
         print("OpeniLink 推送成功！")
     else:
-        print(f'OpeniLink 推送失败！错误信息：{response.get("error")}')
+        raise PushFailed(f'OpeniLink 推送失败！错误信息：{response.get("error")}')
 
 
 def parse_headers(headers):
@@ -1074,14 +1606,19 @@ def custom_notify(title: str, content: str) -> None:
     formatted_url = WEBHOOK_URL.replace(
         "$title", urllib.parse.quote_plus(title)
     ).replace("$content", urllib.parse.quote_plus(content))
-    response = requests.request(
-        method=WEBHOOK_METHOD, url=formatted_url, headers=headers, timeout=15, data=body
+    response = http_request(
+        "custom_notify",
+        method=WEBHOOK_METHOD,
+        url=formatted_url,
+        headers=headers,
+        timeout=15,
+        data=body,
     )
 
     if response.status_code == 200:
         print("自定义通知推送成功！")
     else:
-        print(f"自定义通知推送失败！{response.status_code} {response.text}")
+        raise PushFailed(f"自定义通知推送失败！{response.status_code} {response.text}")
 
 
 def one() -> str:
@@ -1090,115 +1627,977 @@ def one() -> str:
     :return:
     """
     url = "https://v1.hitokoto.cn/"
-    res = requests.get(url).json()
+    res = http_get("hitokoto", url).json()
     return res["hitokoto"] + "    ----" + res["from"]
 
 
-def add_notify_function():
-    notify_function = []
-    if push_config.get("BARK_PUSH"):
-        notify_function.append(bark)
-    if push_config.get("CONSOLE"):
-        notify_function.append(console)
-    if push_config.get("DD_BOT_TOKEN") and push_config.get("DD_BOT_SECRET"):
-        notify_function.append(dingding_bot)
-    if push_config.get("FSKEY"):
-        notify_function.append(feishu_bot)
-    if push_config.get("GOBOT_URL") and push_config.get("GOBOT_QQ"):
-        notify_function.append(go_cqhttp)
-    if push_config.get("GOTIFY_URL") and push_config.get("GOTIFY_TOKEN"):
-        notify_function.append(gotify)
-    if push_config.get("IGOT_PUSH_KEY"):
-        notify_function.append(iGot)
-    if push_config.get("PUSH_KEY"):
-        notify_function.append(serverJ)
-    if push_config.get("DEER_KEY"):
-        notify_function.append(pushdeer)
-    if push_config.get("CHAT_URL") and push_config.get("CHAT_TOKEN"):
-        notify_function.append(chat)
-    if push_config.get("PUSH_PLUS_TOKEN"):
-        notify_function.append(pushplus_bot)
-    if push_config.get("WE_PLUS_BOT_TOKEN"):
-        notify_function.append(weplus_bot)
-    if push_config.get("QMSG_KEY") and push_config.get("QMSG_TYPE"):
-        notify_function.append(qmsg_bot)
-    if push_config.get("QYWX_AM"):
-        notify_function.append(wecom_app)
-    if push_config.get("QYWX_KEY"):
-        notify_function.append(wecom_bot)
-    if push_config.get("TG_BOT_TOKEN") and push_config.get("TG_USER_ID"):
-        notify_function.append(telegram_bot)
-    if (
-        push_config.get("AIBOTK_KEY")
-        and push_config.get("AIBOTK_TYPE")
-        and push_config.get("AIBOTK_NAME")
-    ):
-        notify_function.append(aibotk)
-    if (
-        push_config.get("SMTP_SERVER")
-        and push_config.get("SMTP_SSL")
-        and push_config.get("SMTP_EMAIL")
-        and push_config.get("SMTP_PASSWORD")
-        and push_config.get("SMTP_NAME")
-    ):
-        notify_function.append(smtp)
-    if push_config.get("PUSHME_KEY"):
-        notify_function.append(pushme)
-    if (
-        push_config.get("CHRONOCAT_URL")
-        and push_config.get("CHRONOCAT_QQ")
-        and push_config.get("CHRONOCAT_TOKEN")
-    ):
-        notify_function.append(chronocat)
-    if push_config.get("WEBHOOK_URL") and push_config.get("WEBHOOK_METHOD"):
-        notify_function.append(custom_notify)
-    if push_config.get("NTFY_TOPIC"):
-        notify_function.append(ntfy)
-    if push_config.get("WXPUSHER_APP_TOKEN") and (
-        push_config.get("WXPUSHER_TOPIC_IDS") or push_config.get("WXPUSHER_UIDS")
-    ):
-        notify_function.append(wxpusher_bot)
-    if push_config.get("WXPUSHER_SPT_LIST"):
-        notify_function.append(wxpusher_spt)
-    if push_config.get("OPENILINK_APP_TOKEN"):
-        notify_function.append(openilink)
-    if not notify_function:
+HITOKOTO_FILE = "hitokoto.json"
+HITOKOTO_POOL_SIZE = 20
+# 池中余量低于该值时在后台补充
+HITOKOTO_LOW_WATER = 5
+HITOKOTO_REFILL_BATCH = 5
+
+_hitokoto_pool = []
+_hitokoto_lock = threading.Lock()
+_hitokoto_refilling = False
+
+
+def load_hitokoto_pool() -> list:
+    path = data_path(HITOKOTO_FILE)
+    if not path:
+        return _hitokoto_pool
+    try:
+        with open(path, encoding="utf-8") as f:
+            pool = json.load(f)
+        return pool if isinstance(pool, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def save_hitokoto_pool(pool: list) -> None:
+    global _hitokoto_pool
+    path = data_path(HITOKOTO_FILE)
+    if not path:
+        _hitokoto_pool = pool
+        return
+    try:
+        write_json_file(path, pool)
+    except OSError:
+        _hitokoto_pool = pool
+
+
+def refill_hitokoto() -> None:
+    """
+    后台补充本地一言池，请求失败时提前结束。
+    """
+    global _hitokoto_refilling
+    try:
+        fetched = []
+        for _ in range(HITOKOTO_REFILL_BATCH):
+            try:
+                fetched.append(one())
+            except Exception:
+                break
+        with _hitokoto_lock:
+            pool = load_hitokoto_pool()
+            pool.extend(item for item in fetched if item not in pool)
+            save_hitokoto_pool(pool[-HITOKOTO_POOL_SIZE:])
+    finally:
+        _hitokoto_refilling = False
+
+
+def pop_hitokoto() -> str:
+    """
+    从本地一言池随机取出一条，余量不足时在后台补充，池为空时才直接请求。
+    获取失败返回空字符串。
+    """
+    global _hitokoto_refilling
+    with _hitokoto_lock:
+        pool = load_hitokoto_pool()
+        sentence = pool.pop(random.randrange(len(pool))) if pool else None
+        if sentence is not None:
+            save_hitokoto_pool(pool)
+        refill = len(pool) < HITOKOTO_LOW_WATER and not _hitokoto_refilling
+        if refill:
+            _hitokoto_refilling = True
+    if refill:
+        try:
+            threading.Thread(
+                target=refill_hitokoto, name="hitokoto-refill", daemon=True
+            ).start()
+        except RuntimeError:
+            # 解释器退出阶段无法再启动线程，下次推送时再补充
+            _hitokoto_refilling = False
+
+    if sentence is None:
+        try:
+            sentence = one()
+        except Exception as e:
+            print(f"一言获取失败：{e}")
+            return ""
+    return sentence
+
+
+class Channel:
+    """
+    推送渠道：名称、启用所需的配置项和发送函数。
+    required 中的元组表示其中任意一项有值即可。
+    """
+
+    def __init__(self, name: str, send, required: tuple):
+        self.name = name
+        self.send = send
+        self.required = required
+
+    def enabled(self, config: dict) -> bool:
+        for key in self.required:
+            if isinstance(key, tuple):
+                if not any(config.get(k) for k in key):
+                    return False
+            elif not config.get(key):
+                return False
+        return True
+
+
+CHANNELS = {}
+
+_enabled_channels = None
+
+
+def register_channel(
+    name: str,
+    send,
+    required: tuple,
+    rate_limit: tuple = None,
+    timeout: tuple = None,
+    max_length: int = None,
+    byte_length: bool = False,
+) -> None:
+    """
+    注册推送渠道，第三方渠道无需修改本文件即可接入。
+    :param send: 发送函数，签名为 (title, content)，发送失败时抛出异常，如 PushFailed
+    :param required: 启用该渠道所需的 push_config 配置项
+    :param rate_limit: (每秒补充的令牌数, 桶容量)，见 CHANNEL_RATE_LIMITS
+    :param timeout: (连接超时, 读取超时)，见 CHANNEL_TIMEOUTS
+    :param max_length: 单条消息的长度上限，byte_length 为 True 时按 UTF-8 字节计
+    """
+    CHANNELS[name] = Channel(name, send, tuple(required))
+    if rate_limit:
+        CHANNEL_RATE_LIMITS[name] = rate_limit
+    if timeout:
+        CHANNEL_TIMEOUTS[name] = timeout
+    if max_length:
+        CHANNEL_MAX_LENGTH[name] = max_length
+        if byte_length:
+            BYTE_LENGTH_CHANNELS.add(name)
+    config_changed()
+
+
+def config_changed() -> None:
+    """
+    配置或渠道变化后调用，下次推送时重新计算已启用的渠道。
+    """
+    global _enabled_channels
+    _enabled_channels = None
+
+
+def enabled_channels() -> list:
+    """
+    当前配置下已启用的渠道，默认配置的结果会被缓存。
+    """
+    global _enabled_channels
+    config = push_config.current()
+    if config is not push_config.defaults:
+        return [c for c in CHANNELS.values() if c.enabled(config)]
+    channels = _enabled_channels
+    if channels is None:
+        channels = [c for c in CHANNELS.values() if c.enabled(config)]
+        _enabled_channels = channels
+    return channels
+
+
+register_channel("bark", bark, ("BARK_PUSH",))
+register_channel("console", console, ("CONSOLE",))
+register_channel("dingding_bot", dingding_bot, ("DD_BOT_TOKEN", "DD_BOT_SECRET"))
+register_channel("feishu_bot", feishu_bot, ("FSKEY",))
+register_channel("go_cqhttp", go_cqhttp, ("GOBOT_URL", "GOBOT_QQ"))
+register_channel("gotify", gotify, ("GOTIFY_URL", "GOTIFY_TOKEN"))
+register_channel("iGot", iGot, ("IGOT_PUSH_KEY",))
+register_channel("serverJ", serverJ, ("PUSH_KEY",))
+register_channel("pushdeer", pushdeer, ("DEER_KEY",))
+register_channel("chat", chat, ("CHAT_URL", "CHAT_TOKEN"))
+register_channel("pushplus_bot", pushplus_bot, ("PUSH_PLUS_TOKEN",))
+register_channel("weplus_bot", weplus_bot, ("WE_PLUS_BOT_TOKEN",))
+register_channel("qmsg_bot", qmsg_bot, ("QMSG_KEY", "QMSG_TYPE"))
+register_channel("wecom_app", wecom_app, ("QYWX_AM",))
+register_channel("wecom_bot", wecom_bot, ("QYWX_KEY",))
+register_channel("telegram_bot", telegram_bot, ("TG_BOT_TOKEN", "TG_USER_ID"))
+register_channel("aibotk", aibotk, ("AIBOTK_KEY", "AIBOTK_TYPE", "AIBOTK_NAME"))
+register_channel(
+    "smtp",
+    smtp,
+    ("SMTP_SERVER", "SMTP_SSL", "SMTP_EMAIL", "SMTP_PASSWORD", "SMTP_NAME"),
+)
+register_channel("pushme", pushme, ("PUSHME_KEY",))
+register_channel(
+    "chronocat", chronocat, ("CHRONOCAT_URL", "CHRONOCAT_QQ", "CHRONOCAT_TOKEN")
+)
+register_channel("custom_notify", custom_notify, ("WEBHOOK_URL", "WEBHOOK_METHOD"))
+register_channel("ntfy", ntfy, ("NTFY_TOPIC",))
+register_channel(
+    "wxpusher_bot",
+    wxpusher_bot,
+    ("WXPUSHER_APP_TOKEN", ("WXPUSHER_TOPIC_IDS", "WXPUSHER_UIDS")),
+)
+register_channel("wxpusher_spt", wxpusher_spt, ("WXPUSHER_SPT_LIST",))
+register_channel("openilink", openilink, ("OPENILINK_APP_TOKEN",))
+
+
+def active_channels() -> list:
+    channels = enabled_channels()
+    if not channels:
         print(f"无推送渠道，请检查通知变量是否正确")
-    return notify_function
+    return channels
 
 
-def send(title: str, content: str, ignore_default_config: bool = False, **kwargs):
-    if kwargs:
-        global push_config
-        if ignore_default_config:
-            push_config = kwargs  # 清空从环境变量获取的配置
+def add_notify_function():
+    return [channel.send for channel in active_channels()]
+
+
+# 同时执行的推送渠道上限，所有 send()/async_send() 共享
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY") or 16)
+
+_executor = None
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    获取执行推送渠道的共享线程池，线程数即全局并发上限。
+    """
+    global _executor
+    if _executor is None:
+        with _loop_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=NOTIFY_CONCURRENCY, thread_name_prefix="notify"
+                )
+    return _executor
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    获取同步 send() 使用的后台事件循环，进程内只启动一次。
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="notify-loop", daemon=True
+                ).start()
+                _loop = loop
+    return _loop
+
+
+async def run_blocking(func, *args):
+    """
+    在共享线程池中执行同步函数。解释器退出阶段线程池已关闭，改为直接执行。
+    """
+    loop = asyncio.get_running_loop()
+    # 线程池不会自动传递 contextvars，需要带上当前调用的配置
+    context = contextvars.copy_context()
+    try:
+        future = loop.run_in_executor(get_executor(), context.run, func, *args)
+    except RuntimeError:
+        return context.run(func, *args)
+    return await future
+
+
+async def hitokoto_footer() -> str:
+    if push_config.get("HITOKOTO") in [False, "false"]:
+        return ""
+    sentence = await run_blocking(pop_hitokoto)
+    return "\n\n" + sentence if sentence else ""
+
+
+# 延迟直方图的桶上限，单位秒
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 设置为 false 时不写入 metrics.jsonl
+NOTIFY_METRICS = os.getenv("NOTIFY_METRICS") != "false"
+METRICS_FILE = "metrics.jsonl"
+METRICS_MAX_SIZE = 5 * 1024 * 1024
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def record_metrics(result: ChannelResult) -> None:
+    with _metrics_lock:
+        metrics = _metrics.get(result.channel)
+        if metrics is None:
+            metrics = _metrics[result.channel] = {
+                "count": 0,
+                "errors": 0,
+                "attempts": 0,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "latency_sum": 0.0,
+                "latency_buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                "status": {},
+            }
+        metrics["count"] += 1
+        metrics["errors"] += 0 if result.ok else 1
+        metrics["attempts"] += result.attempts
+        metrics["bytes_sent"] += result.bytes_sent
+        metrics["bytes_received"] += result.bytes_received
+        metrics["latency_sum"] += result.latency
+        bucket = next(
+            (i for i, le in enumerate(LATENCY_BUCKETS) if result.latency <= le),
+            len(LATENCY_BUCKETS),
+        )
+        metrics["latency_buckets"][bucket] += 1
+        status = str(result.status or result.error or "none")
+        metrics["status"][status] = metrics["status"].get(status, 0) + 1
+
+
+def get_metrics() -> dict:
+    """
+    进程内各渠道的累计指标，latency_buckets 与 LATENCY_BUCKETS 对应，最后一项为超出上限的次数。
+    """
+    with _metrics_lock:
+        return json.loads(json.dumps(_metrics))
+
+
+def append_metrics(results: list) -> None:
+    """
+    把推送结果追加到数据目录下的 metrics.jsonl，供面板读取。
+    """
+    path = NOTIFY_METRICS and results and data_path(METRICS_FILE)
+    if not path:
+        return
+    now = time.time()
+    lines = []
+    for result in results:
+        item = asdict(result)
+        item["latency_ms"] = round(item.pop("latency") * 1000, 1)
+        item["ts"] = now
+        lines.append(json.dumps(item, ensure_ascii=False) + "\n")
+    try:
+        if os.path.exists(path) and os.path.getsize(path) > METRICS_MAX_SIZE:
+            os.replace(path, f"{path}.1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+    except OSError as e:
+        print(f"推送指标写入失败：{e}")
+
+
+def run_channel(channel: Channel, title: str, content: str) -> ChannelResult:
+    """
+    执行单个渠道并记录耗时、请求次数、状态码与异常。
+    """
+    result = ChannelResult(channel.name)
+    _channel_result.set(result)
+    start = time.monotonic()
+    try:
+        channel.send(title, content)
+    except PushFailed as e:
+        result.error = type(e).__name__
+        print(str(e))
+    except Exception as e:
+        result.error = type(e).__name__
+        print(f"{channel.name} 推送异常：{e!r}")
+    finally:
+        result.latency = time.monotonic() - start
+        result.finish()
+        record_metrics(result)
+    return result
+
+
+async def run_job(channel: Channel, title: str, content: str) -> ChannelResult:
+    """
+    在事件循环中等待渠道的限速令牌后再交给线程池，排队的渠道不占用线程池中的线程。
+    超过 NOTIFY_RATE_LIMIT_MAX_WAIT 时不预占，由 http_request() 抛出 RateLimited。
+    """
+    bucket = get_bucket(channel.name)
+    wait = bucket.reserve(NOTIFY_RATE_LIMIT_MAX_WAIT) if bucket else None
+    if wait is not None:
+        _reserved_token.set(True)
+        if wait:
+            await asyncio.sleep(wait)
+    return await run_blocking(run_channel, channel, title, content)
+
+
+async def dispatch(jobs: list) -> list:
+    """
+    并发执行 (渠道, 标题, 内容) 列表，单个渠道异常不影响其他渠道，返回各渠道的推送结果。
+    """
+    results = await asyncio.gather(
+        *(run_job(channel, title, content) for channel, title, content in jobs)
+    )
+    append_metrics(results)
+    return list(results)
+
+
+# 合并模式下，缓冲达到该条数时立即发送
+NOTIFY_DIGEST_MAX_ITEMS = int(os.getenv("NOTIFY_DIGEST_MAX_ITEMS") or 50)
+# 合并模式下，首条消息缓冲超过该秒数后发送，0 表示只在任务结束时发送
+NOTIFY_DIGEST_INTERVAL = float(os.getenv("NOTIFY_DIGEST_INTERVAL") or 0)
+
+_digest = []
+_digest_lock = threading.Lock()
+_digest_timer = None
+_digest_registered = False
+
+
+def enable_digest(enabled: bool = True) -> None:
+    """
+    开启或关闭合并模式，关闭时立即发送已缓冲的内容。
+    """
+    push_config["NOTIFY_DIGEST"] = "true" if enabled else "false"
+    if not enabled:
+        flush_digest()
+
+
+def digest_enabled() -> bool:
+    return push_config.get("NOTIFY_DIGEST") == "true"
+
+
+def add_digest(title: str, content: str):
+    """
+    加入合并缓冲区，达到条数阈值时取出并返回需要立即发送的内容。
+    """
+    global _digest_timer, _digest_registered
+    with _digest_lock:
+        if not _digest_registered:
+            atexit.register(flush_digest)
+            _digest_registered = True
+        _digest.append((title, content, push_config.current()))
+        if len(_digest) >= NOTIFY_DIGEST_MAX_ITEMS:
+            return take_digest_locked()
+        if NOTIFY_DIGEST_INTERVAL > 0 and _digest_timer is None:
+            _digest_timer = threading.Timer(NOTIFY_DIGEST_INTERVAL, flush_digest)
+            _digest_timer.daemon = True
+            _digest_timer.start()
+    return None
+
+
+def take_digest_locked() -> list:
+    global _digest_timer
+    if _digest_timer is not None:
+        _digest_timer.cancel()
+        _digest_timer = None
+    items = _digest[:]
+    _digest.clear()
+    return items
+
+
+def text_length(channel: str, text: str) -> int:
+    if channel in BYTE_LENGTH_CHANNELS:
+        return len(text.encode("utf-8"))
+    return len(text)
+
+
+def cut_text(channel: str, text: str, limit: int) -> list:
+    """
+    把超长的一段按行切分，单行仍超长时按字符截断。
+    """
+    if text_length(channel, text) <= limit:
+        return [text]
+    pieces, current = [], ""
+    for line in text.split("\n"):
+        while text_length(channel, line) > limit:
+            low, high = 1, len(line)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if text_length(channel, line[:mid]) <= limit:
+                    low = mid
+                else:
+                    high = mid - 1
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:low])
+            line = line[low:]
+        candidate = f"{current}\n{line}" if current else line
+        if text_length(channel, candidate) <= limit:
+            current = candidate
         else:
-            push_config.update(kwargs)
+            pieces.append(current)
+            current = line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_digest(channel: str, blocks: list, limit: int) -> list:
+    """
+    按渠道长度上限把多条消息合并为尽量少的几段，不在单条消息中间拆分，除非它本身超长。
+    """
+    parts, current = [], ""
+    for block in blocks:
+        for piece in cut_text(channel, block, limit):
+            candidate = f"{current}\n\n{piece}" if current else piece
+            if text_length(channel, candidate) <= limit:
+                current = candidate
+            else:
+                parts.append(current)
+                current = piece
+    if current:
+        parts.append(current)
+    return parts
+
+
+async def send_digest(items: list) -> list:
+    if len(items) == 1:
+        title, blocks = items[0][0], [items[0][1]]
+    else:
+        title = f"{items[0][0]} 等 {len(items)} 条通知"
+        blocks = [f"【{t}】\n{c}" for t, c in items]
+    footer = await hitokoto_footer()
+
+    jobs = []
+    for channel in active_channels():
+        limit = CHANNEL_MAX_LENGTH.get(channel.name)
+        tail = footer
+        if limit:
+            # 一言占用超过一半长度时不再附加
+            if text_length(channel.name, tail) * 2 > limit:
+                tail = ""
+            limit -= text_length(channel.name, tail)
+            parts = split_digest(channel.name, blocks, limit)
+        else:
+            parts = ["\n\n".join(blocks)]
+        parts[-1] += tail
+        for i, part in enumerate(parts):
+            part_title = title if len(parts) == 1 else f"{title} ({i + 1}/{len(parts)})"
+            jobs.append((channel, part_title, part))
+    return await dispatch(jobs)
+
+
+async def send_digests(items: list) -> list:
+    """
+    按各条消息所属的配置分组合并发送。
+    """
+    results = []
+    for config, group in group_by_config(items):
+        token = _call_config.set(config)
+        try:
+            results += await send_digest(group)
+        finally:
+            _call_config.reset(token)
+    return results
+
+
+def flush_digest() -> None:
+    """
+    立即发送合并缓冲区中的内容，任务结束时会自动调用。
+    """
+    with _digest_lock:
+        items = take_digest_locked()
+    if items:
+        asyncio.run_coroutine_threadsafe(send_digests(items), get_loop()).result()
+
 
+def take_pending() -> dict:
+    """
+    取出合并模式和 SMTP 批量模式下缓冲的通知，进程池的子进程用它把通知交回父进程发送。
+    """
+    with _digest_lock:
+        digest = take_digest_locked()
+    with _smtp_lock:
+        batch = _smtp_batch[:]
+        _smtp_batch.clear()
+    # 配置是不能 pickle 的 MappingProxyType，转换为普通字典
+    return {
+        "digest": [(title, content, dict(config)) for title, content, config in digest],
+        "smtp": [(title, content, dict(config)) for title, content, config in batch],
+    }
+
+
+def restore_pending(pending: dict) -> None:
+    """
+    把 take_pending() 取出的通知加入当前进程的缓冲区，与其他通知一起合并发送。
+    """
+    for title, content, config in pending.get("digest", ()):
+        token = _call_config.set(MappingProxyType(config))
+        try:
+            items = add_digest(title, content)
+        finally:
+            _call_config.reset(token)
+        if items:
+            asyncio.run_coroutine_threadsafe(send_digests(items), get_loop()).result()
+
+    batch = pending.get("smtp")
+    if batch:
+        with _smtp_lock:
+            if not _smtp_batch:
+                atexit.register(flush_smtp_batch)
+            _smtp_batch.extend(
+                (title, content, MappingProxyType(config))
+                for title, content, config in batch
+            )
+
+
+def reset_after_fork() -> None:
+    """
+    fork 出的子进程没有父进程的后台线程，fork 时其他线程也可能正持有锁，
+    重新创建锁并丢弃事件循环、线程池、连接、限速和缓冲区，子进程使用时再按需创建。
+    """
+    global mutex, _session, _session_lock, _buckets, _buckets_lock, _wecom_lock
+    global _smtp_server, _smtp_key, _smtp_lock, _hitokoto_lock, _hitokoto_refilling
+    global _executor, _loop, _loop_lock, _metrics, _metrics_lock
+    global _digest_lock, _digest_timer
+    mutex = threading.Lock()
+    _session, _session_lock = None, threading.Lock()
+    _buckets, _buckets_lock = {}, threading.Lock()
+    _wecom_lock = threading.Lock()
+    # 父进程的 SMTP 连接和待发送邮件留给父进程处理
+    _smtp_server, _smtp_key, _smtp_lock = None, None, threading.Lock()
+    _smtp_batch.clear()
+    _hitokoto_lock, _hitokoto_refilling = threading.Lock(), False
+    _executor, _loop, _loop_lock = None, None, threading.Lock()
+    _metrics, _metrics_lock = {}, threading.Lock()
+    _digest.clear()
+    _digest_lock, _digest_timer = threading.Lock(), None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+
+SPOOL_FILE = "spool.db"
+SPOOL_LOCK_FILE = "spool.lock"
+# 队列中的消息最多尝试的次数，超过后标记为 failed
+NOTIFY_SPOOL_MAX_ATTEMPTS = int(os.getenv("NOTIFY_SPOOL_MAX_ATTEMPTS") or 5)
+# 发送失败后重试的间隔上限，单位秒
+SPOOL_RETRY_MAX_WAIT = 300
+# 只剩等待重试的消息时，每次休眠的上限，单位秒，醒来后检查是否有新消息
+SPOOL_POLL_INTERVAL = 5
+# failed 记录的保留时间，单位秒
+SPOOL_FAILED_TTL = 7 * 24 * 3600
+
+
+def spool_mode():
+    mode = push_config.get("NOTIFY_SPOOL")
+    if mode in ("true", "panel") and data_path(SPOOL_FILE):
+        return mode
+    return None
+
+
+def open_spool() -> "sqlite3.Connection":
+    # 只有启用队列时才需要，避免拖慢每个脚本的导入
+    import sqlite3
+
+    path = data_path(SPOOL_FILE)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    os.close(fd)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS spool (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            content TEXT NOT NULL,
+            config TEXT NOT NULL,
+            mode TEXT NOT NULL,
+            channels TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_at REAL NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def enqueue_spool(title: str, content: str, mode: str) -> None:
+    """
+    把消息与本次调用完整的生效配置写入队列，并确保有后台进程在发送。
+    发送进程可能由其他任务启动，环境变量与当前任务不同，因此不能只保存差异；
+    队列文件权限为 0600，配置中的密钥只有运行青龙的用户可以读取。
+    """
+    conn = open_spool()
+    try:
+        conn.execute(
+            "INSERT INTO spool (title, content, config, mode, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (title, content, json.dumps(dict(push_config)), mode, time.time()),
+        )
+    finally:
+        conn.close()
+    start_drainer()
+
+
+def try_lock_spool():
+    """
+    获取发送进程的文件锁，已有进程持有时返回 None。
+    """
+    import fcntl
+
+    fd = os.open(data_path(SPOOL_LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def unlock_spool(fd: int) -> None:
+    import fcntl
+
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def start_drainer() -> None:
+    """
+    没有发送进程时启动一个脱离当前任务的 notify.py --drain。
+    """
+    fd = try_lock_spool()
+    if fd is None:
+        return
+    unlock_spool(fd)
+
+    # 去掉 preload 目录，避免发送进程再执行 sitecustomize 里的 task_before
+    preload_dir = os.path.realpath(
+        os.path.join(os.getenv("QL_DIR", ""), "shell", "preload")
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        item
+        for item in env.get("PYTHONPATH", "").split(os.pathsep)
+        if item and os.path.realpath(item) != preload_dir
+    )
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--drain"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def panel_notify(title: str, content: str) -> None:
+    """
+    通过面板的 SystemNotify 接口发送，使用面板中配置的通知方式。
+    """
+    preload_dir = os.path.join(os.getenv("QL_DIR", ""), "shell", "preload")
+    if preload_dir not in sys.path:
+        sys.path.append(preload_dir)
+    from client import Client
+
+    Client().systemNotify({"title": title, "content": content})
+
+
+async def deliver(title: str, content: str, names=None) -> list:
+    """
+    发送到当前配置下已启用的渠道，names 不为空时只发送到其中的渠道。
+    """
+    channels = active_channels()
+    if names is not None:
+        channels = [channel for channel in channels if channel.name in names]
+    if not channels:
+        return []
+    content += await hitokoto_footer()
+    return await dispatch([(channel, title, content) for channel in channels])
+
+
+async def drain_row(row: tuple):
+    """
+    发送队列中的一条消息，返回 (发送失败的渠道, 错误信息)，全部成功时均为空。
+    """
+    _, title, content, config, mode, channels = row
+    if mode == "panel":
+        try:
+            await run_blocking(panel_notify, title, content)
+            return None, None
+        except Exception as e:
+            return [], repr(e)
+
+    token = _call_config.set(MappingProxyType(json.loads(config)))
+    try:
+        names = json.loads(channels) if channels else None
+        results = await deliver(title, content, names)
+    finally:
+        _call_config.reset(token)
+    failed = [result for result in results if not result.ok]
+    if not failed:
+        return None, None
+    return [result.channel for result in failed], "; ".join(
+        f"{result.channel}: {result.error or result.status}" for result in failed
+    )
+
+
+def drain() -> None:
+    """
+    依次发送队列中的消息，同一时间只有一个进程在发送；失败的渠道按指数退避重试。
+    """
+    fd = try_lock_spool()
+    if fd is None:
+        return
+    conn = open_spool()
+    try:
+        conn.execute(
+            "DELETE FROM spool WHERE status = 'failed' AND created_at < ?",
+            (time.time() - SPOOL_FAILED_TTL,),
+        )
+        while True:
+            row = conn.execute(
+                "SELECT id, title, content, config, mode, channels FROM spool "
+                "WHERE status = 'pending' AND next_at <= ? ORDER BY id LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+            if row:
+                status = "pending"
+                try:
+                    failed, error = asyncio.run(drain_row(row))
+                except Exception as e:
+                    # 配置损坏等无法重试的错误只影响这一条，继续发送后面的消息
+                    failed, error, status = None, repr(e), "failed"
+                else:
+                    if failed is None:
+                        conn.execute("DELETE FROM spool WHERE id = ?", (row[0],))
+                        continue
+                attempts = conn.execute(
+                    "SELECT attempts + 1 FROM spool WHERE id = ?", (row[0],)
+                ).fetchone()[0]
+                if attempts >= NOTIFY_SPOOL_MAX_ATTEMPTS:
+                    status = "failed"
+                conn.execute(
+                    "UPDATE spool SET attempts = ?, next_at = ?, error = ?, "
+                    "channels = COALESCE(?, channels), status = ? WHERE id = ?",
+                    (
+                        attempts,
+                        time.time() + min(2**attempts * 5, SPOOL_RETRY_MAX_WAIT),
+                        error,
+                        json.dumps(failed) if failed else None,
+                        status,
+                        row[0],
+                    ),
+                )
+                continue
+
+            next_at = conn.execute(
+                "SELECT MIN(next_at) FROM spool WHERE status = 'pending'"
+            ).fetchone()[0]
+            if next_at is not None:
+                # 分段休眠，期间新写入的消息不必等到最早的重试时间
+                time.sleep(min(max(next_at - time.time(), 0.1), SPOOL_POLL_INTERVAL))
+                continue
+
+            # 队列已空，释放锁后再检查一次，避免与刚写入队列但未启动发送进程的任务错过
+            unlock_spool(fd)
+            fd = None
+            pending = conn.execute(
+                "SELECT 1 FROM spool WHERE status = 'pending' LIMIT 1"
+            ).fetchone()
+            if not pending:
+                break
+            fd = try_lock_spool()
+            if fd is None:
+                break
+    finally:
+        conn.close()
+        if fd is not None:
+            unlock_spool(fd)
+
+
+async def async_send(
+    title: str, content: str, ignore_default_config: bool = False, **kwargs
+):
+    """
+    在当前事件循环中并发推送到所有已配置的渠道，可直接在协程中 await。
+    kwargs 只作用于本次调用，并发调用之间互不影响。
+    """
+    token = _call_config.set(resolve_config(ignore_default_config, kwargs))
+    try:
+        return await send_with_config(title, content)
+    finally:
+        _call_config.reset(token)
+
+
+async def send_with_config(title: str, content: str) -> SendResult:
+    result = SendResult(title)
     if not content:
         print(f"{title} 推送内容为空！")
-        return
+        return result
 
     # 根据标题跳过一些消息推送，环境变量：SKIP_PUSH_TITLE 用回车分隔
     skipTitle = os.getenv("SKIP_PUSH_TITLE")
     if skipTitle:
         if title in re.split("\n", skipTitle):
             print(f"{title} 在SKIP_PUSH_TITLE环境变量内，跳过推送！")
-            return
+            return result
 
-    hitokoto = push_config.get("HITOKOTO")
-    content += "\n\n" + one() if hitokoto not in [False, "false"] else ""
+    mode = spool_mode()
+    if mode:
+        await run_blocking(enqueue_spool, title, content, mode)
+        result.queued = True
+        return result
 
-    notify_function = add_notify_function()
-    ts = [
-        threading.Thread(target=mode, args=(title, content), name=mode.__name__)
-        for mode in notify_function
-    ]
-    [t.start() for t in ts]
-    [t.join() for t in ts]
+    if digest_enabled():
+        result.queued = True
+        items = add_digest(title, content)
+        if items:
+            result.channels = await send_digests(items)
+        return result
+
+    result.channels = await deliver(title, content)
+    return result
+
+
+def send(title: str, content: str, ignore_default_config: bool = False, **kwargs):
+    """
+    同步推送，在后台事件循环中执行 async_send() 并等待完成，返回 SendResult。
+    """
+    future = asyncio.run_coroutine_threadsafe(
+        async_send(title, content, ignore_default_config, **kwargs), get_loop()
+    )
+    return future.result()
+
+
+def stress(count: int = 200, concurrency: int = 16) -> None:
+    """
+    用 count 组不同的配置并发调用 send() 和 async_send()，检查渠道读到的配置是否属于本次调用。
+    """
+    global NOTIFY_METRICS
+    # 压测使用的是虚拟渠道，不写入面板的指标文件
+    NOTIFY_METRICS = False
+    mismatches = []
+
+    def stress_channel(title: str, content: str) -> None:
+        time.sleep(random.uniform(0, 0.005))
+        if push_config.get("STRESS_KEY") != title:
+            mismatches.append(title)
+
+    register_channel("stress", stress_channel, ("STRESS_KEY",))
+
+    def config(key: str) -> dict:
+        return {"STRESS_KEY": key, "HITOKOTO": "false"}
+
+    async def send_batch(keys: list) -> list:
+        return await asyncio.gather(
+            *(async_send(key, "content", True, **config(key)) for key in keys)
+        )
+
+    def run(i: int) -> list:
+        # 奇数走同步接口，偶数在独立的事件循环中并发 await
+        if i % 2:
+            return [send(f"sync-{i}", "content", True, **config(f"sync-{i}"))]
+        return asyncio.run(send_batch([f"async-{i}-{j}" for j in range(4)]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        batches = list(executor.map(run, range(count)))
+    results = [result for batch in batches for result in batch]
+    elapsed = time.perf_counter() - start
+    delivered = sum(1 for result in results if result.channels and result.ok)
+    print(
+        f"stress: {len(results)} 次发送，{delivered} 次成功，"
+        f"{len(mismatches)} 次读到其他调用的配置，耗时 {elapsed:.2f}s"
+    )
+    if mismatches or delivered != len(results):
+        sys.exit(1)
 
 
 def main():
+    # python3 notify.py --stress [次数] [并发数]
+    args = sys.argv[1:]
+    if args[:1] == ["--stress"]:
+        stress(*(int(arg) for arg in args[1:3]))
+        return
+    if "--drain" in sys.argv:
+        drain()
+        return
     send("title", "content")
 
 
@@ -1,6 +1,6 @@
 const grpc = require('@grpc/grpc-js');
 const protoLoader = require('@grpc/proto-loader');
-const { readFileSync } = require('fs');
+const { existsSync, readFileSync } = require('fs');
 const { join } = require('path');
 
 class GrpcClient {
@@ -9,6 +9,10 @@ class GrpcClient {
     'config/grpc',
   );
 
+  // 面板在同一主机上监听的 unix socket，存在时优先使用，不经过 TCP 和 TLS；
+  // 面板异常退出后文件可能残留，首次调用返回 UNAVAILABLE 时改用 TCP
+  static #socketFile = join(GrpcClient.#certDir, 'api.sock');
+
   static #loadTlsCredentials() {
     try {
       return grpc.credentials.createSsl(
@@ -40,6 +44,7 @@ class GrpcClient {
     'getEnvs',
     'createEnv',
     'updateEnv',
+    'updateEnvs',
     'deleteEnvs',
     'moveEnv',
     'disableEnvs',
@@ -58,8 +63,13 @@ class GrpcClient {
     'runCrons',
   ];
 
+  // 服务端流式接口，返回 grpc 的可读流，不设置截止时间
+  static #streamMethods = ['tailCronLog'];
+
   #client;
   #api = {};
+  #useSocket = existsSync(GrpcClient.#socketFile);
+  #connected = false;
 
   constructor() {
     this.#initializeClient();
@@ -74,43 +84,88 @@ class GrpcClient {
       const packageDefinition = protoLoader.loadSync(protoPath, protoOptions);
       const apiProto = grpc.loadPackageDefinition(packageDefinition).com.ql.api;
 
-      this.#client = new apiProto.Api(
-        serverAddress,
-        GrpcClient.#loadTlsCredentials(),
-        grpcOptions,
-      );
+      if (this.#useSocket) {
+        this.#client = new apiProto.Api(
+          `unix:${GrpcClient.#socketFile}`,
+          grpc.credentials.createInsecure(),
+          grpcOptions,
+        );
+      } else {
+        this.#client = new apiProto.Api(
+          serverAddress,
+          GrpcClient.#loadTlsCredentials(),
+          grpcOptions,
+        );
+      }
     } catch (error) {
       console.error('Failed to initialize gRPC client:', error);
       process.exit(1);
     }
   }
 
-  #promisifyMethod(methodName) {
-    const capitalizedMethod =
-      methodName.charAt(0).toUpperCase() + methodName.slice(1);
-    const method = this.#client[capitalizedMethod].bind(this.#client);
+  #fallbackToTcp() {
+    if (!this.#useSocket || this.#connected) {
+      return false;
+    }
+    this.#useSocket = false;
+    this.#client.close();
+    this.#initializeClient();
+    return true;
+  }
 
-    return async (params = {}) => {
-      return new Promise((resolve, reject) => {
-        const metadata = new grpc.Metadata();
-        const deadline = new Date(
-          Date.now() + GrpcClient.#config.defaultTimeout,
-        );
+  #invoke(capitalizedMethod, params) {
+    return new Promise((resolve, reject) => {
+      const metadata = new grpc.Metadata();
+      const deadline = new Date(Date.now() + GrpcClient.#config.defaultTimeout);
 
-        method(params, metadata, { deadline }, (error, response) => {
+      this.#client[capitalizedMethod](
+        params,
+        metadata,
+        { deadline },
+        (error, response) => {
           if (error) {
             return reject(error);
           }
           resolve(response);
-        });
-      });
+        },
+      );
+    });
+  }
+
+  #promisifyMethod(methodName) {
+    const capitalizedMethod =
+      methodName.charAt(0).toUpperCase() + methodName.slice(1);
+
+    return async (params = {}) => {
+      try {
+        const response = await this.#invoke(capitalizedMethod, params);
+        this.#connected = true;
+        return response;
+      } catch (error) {
+        // 从未连上 unix socket 时请求没有发出，改用 TCP 后重试一次
+        if (error.code === grpc.status.UNAVAILABLE && this.#fallbackToTcp()) {
+          return this.#invoke(capitalizedMethod, params);
+        }
+        throw error;
+      }
     };
   }
 
+  #streamMethod(methodName) {
+    const capitalizedMethod =
+      methodName.charAt(0).toUpperCase() + methodName.slice(1);
+    return (params = {}) =>
+      this.#client[capitalizedMethod](params, new grpc.Metadata());
+  }
+
   #bindMethods() {
     GrpcClient.#methods.forEach((method) => {
       this.#api[method] = this.#promisifyMethod(method);
     });
+    GrpcClient.#streamMethods.forEach((method) => {
+      this.#api[method] = this.#streamMethod(method);
+      this.#api[method].stream = true;
+    });
   }
 
   getApi() {
@@ -160,4 +215,113 @@ process.on('unhandledRejection', (reason, promise) => {
   }
 });
 
+// 作为子进程运行时，通过 stdin/stdout 提供按行分隔的 JSON RPC：
+// 请求 {"id":1,"method":"getEnvs","params":{}}，响应 {"id":1,"result":{}} 或 {"id":1,"error":{}}
+// 流式接口逐条响应 {"id":1,"chunk":{}}（bytes 字段为 base64），结束时响应 {"id":1,"end":true}；
+// 调用方每处理完一条发送 {"id":1,"ack":1}，未确认的条数达到 STREAM_WINDOW 时暂停读取，
+// 发送 {"id":1,"cancel":true} 取消
+const STREAM_WINDOW = 8;
+
+function serveStdio(api) {
+  const readline = require('readline');
+  const rl = readline.createInterface({ input: process.stdin });
+  const streams = new Map();
+
+  const reply = (payload) => {
+    process.stdout.write(`${JSON.stringify(payload)}\n`);
+  };
+
+  const replyError = (id, error) => {
+    reply({
+      id,
+      error: {
+        name: error.name,
+        message: error.message,
+        stack: error.stack,
+      },
+    });
+  };
+
+  const openStream = (id, method, params) => {
+    const call = api[method](params || {});
+    const state = { call, inflight: 0 };
+    streams.set(id, state);
+    call.on('data', (chunk) => {
+      reply({
+        id,
+        chunk: { ...chunk, data: Buffer.from(chunk.data).toString('base64') },
+      });
+      state.inflight += 1;
+      if (state.inflight >= STREAM_WINDOW) {
+        call.pause();
+      }
+    });
+    call.on('end', () => {
+      streams.delete(id);
+      reply({ id, end: true });
+    });
+    call.on('error', (error) => {
+      streams.delete(id);
+      if (error.code === grpc.status.CANCELLED) {
+        return reply({ id, end: true });
+      }
+      replyError(id, error);
+    });
+  };
+
+  rl.on('line', async (line) => {
+    if (!line.trim()) {
+      return;
+    }
+
+    let request;
+    try {
+      request = JSON.parse(line);
+    } catch (error) {
+      return;
+    }
+
+    const { id, method, params } = request;
+    const stream = streams.get(id);
+    if (request.ack) {
+      if (stream) {
+        stream.inflight -= request.ack;
+        if (stream.inflight < STREAM_WINDOW) {
+          stream.call.resume();
+        }
+      }
+      return;
+    }
+    if (request.cancel) {
+      stream?.call.cancel();
+      return;
+    }
+    if (typeof api[method] !== 'function' || method === 'close') {
+      return reply({
+        id,
+        error: { name: 'Error', message: `Unknown method: ${method}` },
+      });
+    }
+
+    try {
+      if (api[method].stream) {
+        return openStream(id, method, params);
+      }
+      const result = await api[method](params || {});
+      reply({ id, result });
+    } catch (error) {
+      replyError(id, error);
+    }
+  });
+
+  rl.on('close', () => {
+    grpcClient.close();
+    process.exit(0);
+  });
+}
+
+if (require.main === module) {
+  serveStdio(grpcClient.getApi());
+}
+
 module.exports = grpcClient.getApi();
@@ -1,11 +1,30 @@
+import asyncio
+import atexit
+import base64
+import copy
+import itertools
+import shutil
 import subprocess
 import json
 import tempfile
+import threading
+import time
 import os
-from typing import Dict, List, TypedDict, Optional
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from queue import Empty, Queue
+from typing import AsyncIterator, Dict, Iterator, List, TypedDict, Optional
 from functools import wraps
 
 
+def error_message(error: Exception) -> str:
+    error_msg = str(error)
+    if "Error:" in error_msg:
+        error_msg = error_msg.split("Error:")[-1].split("\n")[0].strip()
+    return error_msg
+
+
 def error_handler(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -33,14 +52,21 @@ def error_handler(func):
                     ) from None
             raise Exception(f"{str(e)}") from None
         except Exception as e:
-            error_msg = str(e)
-            if "Error:" in error_msg:
-                error_msg = error_msg.split("Error:")[-1].split("\n")[0].strip()
-            raise Exception(f"{error_msg}") from None
+            raise Exception(error_message(e)) from None
 
     return wrapper
 
 
+def stream_error_handler(stream: Iterator) -> Iterator:
+    """
+    流式接口在迭代时才接收数据，迭代中抛出的错误按 error_handler 的方式转换。
+    """
+    try:
+        yield from stream
+    except Exception as e:
+        raise Exception(error_message(e)) from None
+
+
 class EnvItem(TypedDict, total=False):
     id: Optional[int]
     name: Optional[str]
@@ -62,6 +88,10 @@ class UpdateEnvParams(TypedDict):
     env: EnvItem
 
 
+class UpdateEnvsParams(TypedDict):
+    envs: List[EnvItem]
+
+
 class DeleteEnvsParams(TypedDict):
     ids: List[int]
 
@@ -163,10 +193,46 @@ class CronDetailParams(TypedDict):
     log_path: str
 
 
+class TailCronLogParams(TypedDict, total=False):
+    id: int
+    log_path: str
+    offset: int
+    follow: bool
+
+
+class CronLogChunk(TypedDict):
+    data: bytes
+    offset: str
+
+
+class GetCronsParams(TypedDict, total=False):
+    searchValue: str
+    page: int
+    size: int
+    afterId: int
+
+
+class GetCronByIdParams(TypedDict):
+    id: int
+
+
+class EnableCronsParams(TypedDict):
+    ids: List[int]
+
+
+class DisableCronsParams(TypedDict):
+    ids: List[int]
+
+
+class RunCronsParams(TypedDict):
+    ids: List[int]
+
+
 class CronsResponse(TypedDict):
     code: int
     data: List[CronItem]
     message: Optional[str]
+    total: Optional[int]
 
 
 class CronResponse(TypedDict):
@@ -175,21 +241,377 @@ class CronResponse(TypedDict):
     message: Optional[str]
 
 
+# 进程内的所有 NodeBridge，fork 后在子进程中重置，退出时关闭
+_bridges = weakref.WeakSet()
+
+
+class NodeBridge:
+    """
+    常驻的 client.js 子进程，通过 stdin/stdout 上按行分隔的 JSON 通信，
+    多个并发请求共享同一个 gRPC 连接。
+    """
+
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+        self._process = None
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._streams = {}
+        self._pid = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        _bridges.add(self)
+
+    def _after_fork(self):
+        """
+        fork 时其他线程可能正持有锁，子进程中重新创建锁并丢弃父进程的子进程与等待表。
+        """
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._process = None
+        self._reader = None
+        self._pending = {}
+        self._streams = {}
+        self._pid = os.getpid()
+
+    def _get_process(self):
+        """
+        返回 (子进程, 等待中的请求, 进行中的流)，子进程不存在或已退出时重新启动。
+        调用方需持有 self._lock。
+        """
+        if self._pid != os.getpid():
+            # fork 后子进程不能复用父进程的管道，也没有读取线程
+            self._process = None
+            self._pid = os.getpid()
+        if self._process is None or self._process.poll() is not None:
+            self._start()
+        return self._process, self._pending, self._streams
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ["node", f'{os.getenv("QL_DIR")}/shell/preload/client.js'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        # 每个子进程有独立的等待表，旧进程退出时只唤醒发给它的请求
+        self._pending = {}
+        self._streams = {}
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            args=(self._process, self._pending, self._streams),
+            name="ql-node-bridge",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def _read_loop(self, process, pending, streams):
+        for line in process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                waiter = pending.pop(message.get("id"), None)
+                queue = streams.get(message.get("id"))
+            if waiter:
+                waiter[1] = message
+                waiter[0].set()
+            elif queue is not None:
+                queue.put(message)
+
+        # 子进程退出，唤醒发给该进程的所有请求
+        error = {"error": {"name": "Error", "message": "node bridge exited"}}
+        with self._lock:
+            waiters = list(pending.values())
+            pending.clear()
+            queues = list(streams.values())
+        for waiter in waiters:
+            waiter[1] = error
+            waiter[0].set()
+        for queue in queues:
+            queue.put(error)
+
+    def _send(self, process, payload: Dict) -> None:
+        with self._write_lock:
+            process.stdin.write(json.dumps(payload) + "\n")
+            process.stdin.flush()
+
+    def call(self, method: str, params: Dict = None, timeout: float = None) -> Dict:
+        request_id = next(self._ids)
+        waiter = [threading.Event(), None]
+        with self._lock:
+            process, pending, _ = self._get_process()
+            pending[request_id] = waiter
+
+        payload = {"id": request_id, "method": method, "params": params}
+        try:
+            self._send(process, payload)
+        except (OSError, ValueError) as e:
+            with self._lock:
+                pending.pop(request_id, None)
+            raise Exception(f"node bridge write failed: {e}") from None
+
+        if not waiter[0].wait(timeout or self.timeout):
+            with self._lock:
+                pending.pop(request_id, None)
+            raise Exception(f"{method} timed out")
+
+        response = waiter[1]
+        if "error" in response:
+            error = response["error"]
+            raise Exception(f"{error.get('name', 'Error')}: {error.get('message')}")
+        return response.get("result")
+
+    def stream(
+        self, method: str, params: Dict = None, timeout: float = None
+    ) -> Iterator[Dict]:
+        """
+        调用服务端流式接口，每处理完一条再向 client.js 确认，
+        未确认的条数达到上限时 client.js 暂停读取，由 gRPC 流控让服务端暂停发送。
+        timeout 为等待下一条的最长时间，默认一直等待。
+        """
+        request_id = next(self._ids)
+        queue = Queue()
+        with self._lock:
+            process, _, streams = self._get_process()
+            streams[request_id] = queue
+
+        finished = False
+        try:
+            try:
+                self._send(
+                    process, {"id": request_id, "method": method, "params": params}
+                )
+            except (OSError, ValueError) as e:
+                finished = True
+                raise Exception(f"node bridge write failed: {e}") from None
+
+            while True:
+                try:
+                    message = queue.get(timeout=timeout)
+                except Empty:
+                    raise Exception(f"{method} timed out") from None
+                if "chunk" in message:
+                    chunk = message["chunk"]
+                    chunk["data"] = base64.b64decode(chunk.get("data") or "")
+                    yield chunk
+                    self._send(process, {"id": request_id, "ack": 1})
+                    continue
+                finished = True
+                if "error" in message:
+                    error = message["error"]
+                    raise Exception(
+                        f"{error.get('name', 'Error')}: {error.get('message')}"
+                    )
+                return
+        finally:
+            with self._lock:
+                streams.pop(request_id, None)
+            if not finished:
+                # 调用方提前停止迭代，通知 client.js 取消调用
+                try:
+                    self._send(process, {"id": request_id, "cancel": True})
+                except (OSError, ValueError):
+                    pass
+
+    def close(self):
+        process, self._process = self._process, None
+        # 子进程中不能关闭父进程启动的 client.js
+        if process is None or self._pid != os.getpid() or process.poll() is not None:
+            return
+        try:
+            # 关闭 stdin 后 client.js 会自行关闭 gRPC 连接并退出
+            process.stdin.close()
+            process.wait(timeout=3)
+        except Exception:
+            process.kill()
+
+
+def _reset_bridges_after_fork():
+    for bridge in list(_bridges):
+        bridge._after_fork()
+
+
+def _close_bridges():
+    for bridge in list(_bridges):
+        bridge.close()
+
+
+# 只注册一次，atexit 持有实例方法会使 WeakSet 中的实例永远不被回收
+atexit.register(_close_bridges)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_bridges_after_fork)
+
+
+class ResponseCache:
+    """
+    读接口的缓存，条目按 ttl 秒过期，超过 maxsize 时淘汰最久未使用的条目。
+    """
+
+    MISSING = object()
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # 每次失效加一，避免失效前发起的读请求把旧数据写回缓存
+        self.generation = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, params: Dict = None) -> str:
+        return f"{method}:{json.dumps(params, sort_keys=True)}"
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return self.MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(item[1])
+
+    def set(self, key: str, value, generation: int) -> None:
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
 class Client:
-    def __init__(self):
-        self.temp_dir = tempfile.mkdtemp(prefix="node_client_")
-        self.temp_script = os.path.join(self.temp_dir, "temp_script.js")
+    # 开启缓存后直接返回缓存结果的读接口
+    CACHED_METHODS = {"getEnvs", "getEnvById"}
+    # 调用后清空缓存的写接口
+    ENV_WRITE_METHODS = {
+        "createEnv",
+        "updateEnv",
+        "updateEnvs",
+        "deleteEnvs",
+        "moveEnv",
+        "disableEnvs",
+        "enableEnvs",
+        "updateEnvNames",
+    }
+
+    def __init__(self, cache_ttl: float = None, cache_size: int = None):
+        # 仅在回退到逐次启动 node 时才创建临时目录
+        self.temp_dir = None
+        # 首次调用接口时才选择传输方式，只用 QLAPI.notify 的脚本不必导入 grpcio
+        self._transport = None
+        self._transport_ready = False
+        self._transport_lock = threading.Lock()
+        # QL_API_CACHE_TTL 大于 0 时开启 getEnvs/getEnvById 缓存，QL_API_CACHE_SIZE 为条目上限
+        if cache_ttl is None:
+            cache_ttl = float(os.getenv("QL_API_CACHE_TTL") or 0)
+        if cache_size is None:
+            cache_size = int(os.getenv("QL_API_CACHE_SIZE") or 128)
+        self._cache = ResponseCache(cache_ttl, cache_size) if cache_ttl > 0 else None
 
     def __del__(self):
         try:
-            if os.path.exists(self.temp_script):
-                os.remove(self.temp_script)
-            os.rmdir(self.temp_dir)
+            if self._transport is not None:
+                self._transport.close()
         except Exception:
             pass
+        if self.temp_dir:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _get_transport(self):
+        if not self._transport_ready:
+            with self._transport_lock:
+                if not self._transport_ready:
+                    self._transport = self._init_transport()
+                    self._transport_ready = True
+        return self._transport
+
+    @staticmethod
+    def _init_transport():
+        # QL_API_TRANSPORT: auto(默认，优先 grpcio，其次常驻 node 进程) / grpc / bridge / node
+        mode = os.getenv("QL_API_TRANSPORT", "auto")
+        if mode in ("auto", "grpc"):
+            try:
+                from client_grpc import GrpcTransport
+
+                return GrpcTransport()
+            except Exception:
+                pass
+        if mode in ("auto", "bridge"):
+            try:
+                return NodeBridge()
+            except Exception:
+                pass
+        return None
+
+    def _call(self, method: str, params: Dict = None, timeout: float = None) -> Dict:
+        cache = self._cache
+        if cache is None:
+            return self._request(method, params, timeout)
+
+        if method in self.CACHED_METHODS:
+            key = cache.key(method, params)
+            result = cache.get(key)
+            if result is not ResponseCache.MISSING:
+                return result
+            generation = cache.generation
+            result = self._request(method, params, timeout)
+            # 只缓存成功的结果，错误响应下次调用时重新请求
+            if isinstance(result, dict) and result.get("code") == 200:
+                cache.set(key, result, generation)
+            return result
+
+        try:
+            return self._request(method, params, timeout)
+        finally:
+            # 写接口失败时也可能已部分生效，无论结果如何都清空缓存
+            if method in self.ENV_WRITE_METHODS:
+                cache.clear()
+
+    def _request(self, method: str, params: Dict = None, timeout: float = None) -> Dict:
+        transport = self._get_transport()
+        if transport is not None:
+            return transport.call(method, params, timeout)
+        return self._execute_node(method, params, timeout)
+
+    def cacheStats(self) -> Dict:
+        """
+        缓存的命中与未命中次数，未开启缓存时返回 None。
+        """
+        return self._cache.stats() if self._cache is not None else None
+
+    def clearCache(self) -> None:
+        if self._cache is not None:
+            self._cache.clear()
 
     @error_handler
-    def _execute_node(self, method: str, params: Dict = None) -> Dict:
+    def _execute_node(
+        self, method: str, params: Dict = None, timeout: float = None
+    ) -> Dict:
         node_code = f"""
         const api = require('{os.getenv("QL_DIR")}/shell/preload/client.js');
         
@@ -208,15 +630,23 @@ class Client:
         }})();
         """
 
-        with open(self.temp_script, "w", encoding="utf-8") as f:
-            f.write(node_code)
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix="node_client_")
 
-        result = subprocess.run(
-            ["node", self.temp_script],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
+        # 每次调用使用独立的脚本文件，避免并发调用互相覆盖
+        fd, temp_script = tempfile.mkstemp(suffix=".js", dir=self.temp_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(node_code)
+
+            result = subprocess.run(
+                ["node", temp_script],
+                capture_output=True,
+                text=True,
+                timeout=timeout or 30,
+            )
+        finally:
+            os.remove(temp_script)
 
         if result.returncode != 0:
             error_data = json.loads(result.stderr)
@@ -228,56 +658,284 @@ class Client:
 
     @error_handler
     def getEnvs(self, params: GetEnvsParams = None) -> EnvsResponse:
-        return self._execute_node("getEnvs", params)
+        return self._call("getEnvs", params)
 
     @error_handler
     def createEnv(self, data: CreateEnvParams) -> EnvsResponse:
-        return self._execute_node("createEnv", data)
+        return self._call("createEnv", data)
 
     @error_handler
     def updateEnv(self, data: UpdateEnvParams) -> EnvResponse:
-        return self._execute_node("updateEnv", data)
+        return self._call("updateEnv", data)
+
+    @error_handler
+    def updateEnvs(self, data: UpdateEnvsParams) -> EnvsResponse:
+        return self._call("updateEnvs", data)
 
     @error_handler
     def deleteEnvs(self, data: DeleteEnvsParams) -> Response:
-        return self._execute_node("deleteEnvs", data)
+        return self._call("deleteEnvs", data)
 
     @error_handler
     def moveEnv(self, data: MoveEnvParams) -> EnvResponse:
-        return self._execute_node("moveEnv", data)
+        return self._call("moveEnv", data)
 
     @error_handler
     def disableEnvs(self, data: DisableEnvsParams) -> Response:
-        return self._execute_node("disableEnvs", data)
+        return self._call("disableEnvs", data)
 
     @error_handler
     def enableEnvs(self, data: EnableEnvsParams) -> Response:
-        return self._execute_node("enableEnvs", data)
+        return self._call("enableEnvs", data)
 
     @error_handler
     def updateEnvNames(self, data: UpdateEnvNamesParams) -> Response:
-        return self._execute_node("updateEnvNames", data)
+        return self._call("updateEnvNames", data)
 
     @error_handler
     def getEnvById(self, data: GetEnvByIdParams) -> EnvResponse:
-        return self._execute_node("getEnvById", data)
+        return self._call("getEnvById", data)
 
     @error_handler
     def systemNotify(self, data: SystemNotifyParams) -> Response:
-        return self._execute_node("systemNotify", data)
+        return self._call("systemNotify", data)
 
     @error_handler
     def getCronDetail(self, data: CronDetailParams) -> CronResponse:
-        return self._execute_node("getCronDetail", data)
+        return self._call("getCronDetail", data)
 
     @error_handler
     def createCron(self, data: CreateCronParams) -> CronResponse:
-        return self._execute_node("createCron", data)
+        return self._call("createCron", data)
 
     @error_handler
     def updateCron(self, data: UpdateCronParams) -> CronResponse:
-        return self._execute_node("updateCron", data)
+        return self._call("updateCron", data)
 
     @error_handler
     def deleteCrons(self, data: DeleteCronsParams) -> Response:
-        return self._execute_node("deleteCrons", data)
+        return self._call("deleteCrons", data)
+
+    @error_handler
+    def getCrons(self, params: GetCronsParams = None) -> CronsResponse:
+        return self._call("getCrons", params)
+
+    @error_handler
+    def getCronById(self, data: GetCronByIdParams) -> CronResponse:
+        return self._call("getCronById", data)
+
+    @error_handler
+    def enableCrons(self, data: EnableCronsParams) -> Response:
+        return self._call("enableCrons", data)
+
+    @error_handler
+    def disableCrons(self, data: DisableCronsParams) -> Response:
+        return self._call("disableCrons", data)
+
+    @error_handler
+    def runCrons(self, data: RunCronsParams) -> Response:
+        return self._call("runCrons", data)
+
+    @error_handler
+    def tailCronLog(self, data: TailCronLogParams) -> Iterator[CronLogChunk]:
+        """
+        从 offset 开始逐块读取定时任务的日志，传入 id 时读取该任务最近一次的日志。
+        follow 为 True 时持续返回新写入的日志，直到任务结束。
+        每块的 offset 为读取下一块的位置，可用于断点续读；调用方处理慢时服务端暂停读取文件。
+        """
+        transport = self._get_transport()
+        if transport is None:
+            raise Exception("tailCronLog requires grpcio or the node bridge")
+        return stream_error_handler(transport.stream("tailCronLog", data))
+
+    def iterCrons(
+        self, params: GetCronsParams = None, page_size: int = 100
+    ) -> Iterator[CronItem]:
+        """
+        按 id 升序逐页获取定时任务，每次只持有一页数据。
+        以上一页最后的 id 作为下一页的起点，遍历期间增删任务不会导致重复或遗漏。
+        """
+        after_id = 0
+        while True:
+            response = self.getCrons(
+                {**(params or {}), "afterId": after_id, "size": page_size}
+            )
+            if response.get("code") != 200:
+                raise Exception(response.get("message") or "getCrons failed")
+            data = response.get("data") or []
+            yield from data
+            if len(data) < page_size:
+                return
+            after_id = data[-1]["id"]
+
+
+class AsyncClient:
+    """
+    Client 的 asyncio 版本，所有方法均可 await。
+    concurrency 限制同时进行的请求数，timeout 为单次调用的截止时间（秒）。
+    """
+
+    def __init__(
+        self, client: Client = None, concurrency: int = None, timeout: float = None
+    ):
+        self._client = client or Client()
+        self.concurrency = concurrency or int(os.getenv("QL_API_CONCURRENCY", "10"))
+        self.timeout = timeout or 30
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="ql-api"
+        )
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    @error_handler
+    def _invoke(self, method: str, params: Dict, timeout: float) -> Dict:
+        return self._client._call(method, params, timeout)
+
+    async def _call(self, method: str, params: Dict = None, timeout: float = None):
+        timeout = timeout or self.timeout
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._executor, self._invoke, method, params, timeout
+            )
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise Exception(f"{method} timed out after {timeout}s") from None
+
+    def cacheStats(self) -> Dict:
+        return self._client.cacheStats()
+
+    def clearCache(self) -> None:
+        self._client.clearCache()
+
+    async def gather(
+        self, method: str, params_list: List[Dict], return_exceptions: bool = False
+    ) -> List:
+        """
+        对同一个方法并发发起多次调用，结果顺序与 params_list 一致。
+        """
+        return await asyncio.gather(
+            *(self._call(method, params) for params in params_list),
+            return_exceptions=return_exceptions,
+        )
+
+    async def getEnvs(
+        self, params: GetEnvsParams = None, timeout: float = None
+    ) -> EnvsResponse:
+        return await self._call("getEnvs", params, timeout)
+
+    async def createEnv(
+        self, data: CreateEnvParams, timeout: float = None
+    ) -> EnvsResponse:
+        return await self._call("createEnv", data, timeout)
+
+    async def updateEnv(
+        self, data: UpdateEnvParams, timeout: float = None
+    ) -> EnvResponse:
+        return await self._call("updateEnv", data, timeout)
+
+    async def updateEnvs(
+        self, data: UpdateEnvsParams, timeout: float = None
+    ) -> EnvsResponse:
+        return await self._call("updateEnvs", data, timeout)
+
+    async def deleteEnvs(
+        self, data: DeleteEnvsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("deleteEnvs", data, timeout)
+
+    async def moveEnv(self, data: MoveEnvParams, timeout: float = None) -> EnvResponse:
+        return await self._call("moveEnv", data, timeout)
+
+    async def disableEnvs(
+        self, data: DisableEnvsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("disableEnvs", data, timeout)
+
+    async def enableEnvs(
+        self, data: EnableEnvsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("enableEnvs", data, timeout)
+
+    async def updateEnvNames(
+        self, data: UpdateEnvNamesParams, timeout: float = None
+    ) -> Response:
+        return await self._call("updateEnvNames", data, timeout)
+
+    async def getEnvById(
+        self, data: GetEnvByIdParams, timeout: float = None
+    ) -> EnvResponse:
+        return await self._call("getEnvById", data, timeout)
+
+    async def systemNotify(
+        self, data: SystemNotifyParams, timeout: float = None
+    ) -> Response:
+        return await self._call("systemNotify", data, timeout)
+
+    async def getCronDetail(
+        self, data: CronDetailParams, timeout: float = None
+    ) -> CronResponse:
+        return await self._call("getCronDetail", data, timeout)
+
+    async def createCron(
+        self, data: CreateCronParams, timeout: float = None
+    ) -> CronResponse:
+        return await self._call("createCron", data, timeout)
+
+    async def updateCron(
+        self, data: UpdateCronParams, timeout: float = None
+    ) -> CronResponse:
+        return await self._call("updateCron", data, timeout)
+
+    async def deleteCrons(
+        self, data: DeleteCronsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("deleteCrons", data, timeout)
+
+    async def getCrons(
+        self, params: GetCronsParams = None, timeout: float = None
+    ) -> CronsResponse:
+        return await self._call("getCrons", params, timeout)
+
+    async def getCronById(
+        self, data: GetCronByIdParams, timeout: float = None
+    ) -> CronResponse:
+        return await self._call("getCronById", data, timeout)
+
+    async def enableCrons(
+        self, data: EnableCronsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("enableCrons", data, timeout)
+
+    async def disableCrons(
+        self, data: DisableCronsParams, timeout: float = None
+    ) -> Response:
+        return await self._call("disableCrons", data, timeout)
+
+    async def runCrons(self, data: RunCronsParams, timeout: float = None) -> Response:
+        return await self._call("runCrons", data, timeout)
+
+    async def iterCrons(
+        self, params: GetCronsParams = None, page_size: int = 100
+    ) -> AsyncIterator[CronItem]:
+        after_id = 0
+        while True:
+            response = await self.getCrons(
+                {**(params or {}), "afterId": after_id, "size": page_size}
+            )
+            if response.get("code") != 200:
+                raise Exception(response.get("message") or "getCrons failed")
+            data = response.get("data") or []
+            for item in data:
+                yield item
+            if len(data) < page_size:
+                return
+            after_id = data[-1]["id"]
@@ -0,0 +1,411 @@
+import os
+import re
+import socket
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import grpc
+except ImportError:
+    grpc = None
+
+SERVICE = "com.ql.api.Api"
+DEFAULT_TIMEOUT = 30
+
+_SCALARS = {"int32", "int64", "string", "bool", "bytes"}
+
+# 字段表在导入时从 back/protos/api.proto 生成，与 client.js 读取同一份定义
+PROTO_PATH = os.path.join(
+    os.getenv("QL_DIR")
+    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."),
+    "back",
+    "protos",
+    "api.proto",
+)
+
+_BLOCK_RE = re.compile(r"\b(message|enum)\s+(\w+)\s*\{([^{}]*)\}")
+_FIELD_RE = re.compile(r"(?:\b(optional|repeated)\s+)?(\w+)\s+(\w+)\s*=\s*(\d+)\s*;")
+_ENUM_VALUE_RE = re.compile(r"(\w+)\s*=\s*(\d+)\s*;")
+_RPC_RE = re.compile(
+    r"\brpc\s+(\w+)\s*\(\s*(\w+)\s*\)\s*returns\s*\(\s*(stream\s+)?(\w+)\s*\)"
+)
+
+
+def parse_proto(text: str):
+    """
+    解析 api.proto 中的 message、enum 和 rpc，只支持本项目用到的 proto3 语法。
+    返回 (消息字段表, 枚举, 普通方法, 服务端流式方法)，
+    字段为 (字段号, 字段名, 类型, 修饰)，修饰 "" 为 proto3 隐式字段，
+    "optional" 为显式可选，"repeated" 为数组；方法名与 client.js 一致，首字母小写。
+    """
+    text = re.sub(r"//[^\n]*", "", text)
+    messages, enums, methods, stream_methods = {}, {}, {}, {}
+    for kind, name, body in _BLOCK_RE.findall(text):
+        if kind == "enum":
+            values = sorted(
+                (int(number), value) for value, number in _ENUM_VALUE_RE.findall(body)
+            )
+            enums[name] = [value for _, value in values]
+        else:
+            messages[name] = [
+                (int(number), field, type_name, label)
+                for label, type_name, field, number in _FIELD_RE.findall(body)
+            ]
+    for rpc, request_type, stream, response_type in _RPC_RE.findall(text):
+        table = stream_methods if stream else methods
+        table[rpc[0].lower() + rpc[1:]] = (request_type, response_type)
+    return messages, enums, methods, stream_methods
+
+
+def load_proto(path: str = PROTO_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return parse_proto(f.read())
+    except OSError:
+        return {}, {}, {}, {}
+
+
+MESSAGES: Dict[str, List[Tuple[int, str, str, str]]]
+ENUMS: Dict[str, List[str]]
+# 方法名 -> (请求类型, 响应类型)
+METHODS: Dict[str, Tuple[str, str]]
+# 服务端流式接口：方法名 -> (请求类型, 响应类型)
+STREAM_METHODS: Dict[str, Tuple[str, str]]
+MESSAGES, ENUMS, METHODS, STREAM_METHODS = load_proto()
+
+
+def _encode_varint(value: int) -> bytes:
+    value &= 0xFFFFFFFFFFFFFFFF
+    out = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(bits | 0x80)
+        else:
+            out.append(bits)
+            return bytes(out)
+
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _to_signed(value: int, bits: int) -> int:
+    value &= (1 << bits) - 1
+    if value >= 1 << (bits - 1):
+        value -= 1 << bits
+    return value
+
+
+def _enum_number(type_name: str, value) -> int:
+    if isinstance(value, str):
+        return ENUMS[type_name].index(value)
+    return int(value)
+
+
+def _encode_value(type_name: str, value) -> Tuple[int, bytes]:
+    if type_name in ("int32", "int64"):
+        return 0, _encode_varint(int(value))
+    if type_name == "bool":
+        return 0, _encode_varint(1 if value else 0)
+    if type_name in ENUMS:
+        return 0, _encode_varint(_enum_number(type_name, value))
+    if type_name == "string":
+        raw = str(value).encode("utf-8")
+    elif type_name == "bytes":
+        raw = bytes(value)
+    else:
+        raw = encode(type_name, value)
+    return 2, _encode_varint(len(raw)) + raw
+
+
+def _is_default(type_name: str, value) -> bool:
+    if type_name == "string":
+        return value == ""
+    if type_name in ENUMS:
+        return _enum_number(type_name, value) == 0
+    if type_name in _SCALARS:
+        return not value
+    return False
+
+
+def encode(message_type: str, message: Optional[Dict]) -> bytes:
+    out = bytearray()
+    message = message or {}
+    for number, name, type_name, label in MESSAGES[message_type]:
+        value = message.get(name)
+        if value is None:
+            continue
+        if label == "repeated":
+            if not value:
+                continue
+            if type_name in ("int32", "int64", "bool") or type_name in ENUMS:
+                packed = b"".join(_encode_value(type_name, v)[1] for v in value)
+                out += _encode_varint(number << 3 | 2)
+                out += _encode_varint(len(packed)) + packed
+            else:
+                for item in value:
+                    wire_type, raw = _encode_value(type_name, item)
+                    out += _encode_varint(number << 3 | wire_type) + raw
+            continue
+        if label == "" and _is_default(type_name, value):
+            continue
+        wire_type, raw = _encode_value(type_name, value)
+        out += _encode_varint(number << 3 | wire_type) + raw
+    return bytes(out)
+
+
+def _decode_scalar(type_name: str, value: int):
+    if type_name == "int32":
+        return _to_signed(value, 32)
+    if type_name == "int64":
+        # 与 client.js 的 longs: String 选项保持一致
+        return str(_to_signed(value, 64))
+    if type_name == "bool":
+        return bool(value)
+    names = ENUMS[type_name]
+    return names[value] if value < len(names) else value
+
+
+def _default(type_name: str, label: str):
+    if label == "repeated":
+        return []
+    if type_name == "string":
+        return ""
+    if type_name == "bytes":
+        return b""
+    if type_name == "int64":
+        return "0"
+    if type_name == "bool":
+        return False
+    if type_name in ENUMS:
+        return ENUMS[type_name][0]
+    if type_name in _SCALARS:
+        return 0
+    return None
+
+
+def decode(message_type: str, data: bytes) -> Dict:
+    fields = {field[0]: field for field in MESSAGES[message_type]}
+    result = {
+        name: _default(type_name, label)
+        for _, name, type_name, label in MESSAGES[message_type]
+        if label != "optional"
+    }
+    pos = 0
+    end = len(data)
+    while pos < end:
+        tag, pos = _decode_varint(data, pos)
+        number, wire_type = tag >> 3, tag & 7
+        field = fields.get(number)
+        if wire_type == 0:
+            raw, pos = _decode_varint(data, pos)
+        elif wire_type == 1:
+            raw, pos = data[pos : pos + 8], pos + 8
+        elif wire_type == 5:
+            raw, pos = data[pos : pos + 4], pos + 4
+        elif wire_type == 2:
+            length, pos = _decode_varint(data, pos)
+            raw, pos = data[pos : pos + length], pos + length
+        else:
+            raise ValueError(f"unsupported wire type {wire_type} in {message_type}")
+        if field is None:
+            continue
+
+        _, name, type_name, label = field
+        if type_name == "string":
+            value = raw.decode("utf-8")
+        elif type_name == "bytes":
+            value = bytes(raw)
+        elif type_name in MESSAGES:
+            value = decode(type_name, raw)
+        elif wire_type == 2:
+            values = []
+            packed_pos = 0
+            while packed_pos < len(raw):
+                item, packed_pos = _decode_varint(raw, packed_pos)
+                values.append(_decode_scalar(type_name, item))
+            result.setdefault(name, []).extend(values)
+            continue
+        else:
+            value = _decode_scalar(type_name, raw)
+
+        if label == "repeated":
+            result.setdefault(name, []).append(value)
+        else:
+            result[name] = value
+    return result
+
+
+def socket_connectable(path: str) -> bool:
+    """
+    面板异常退出后 socket 文件可能残留，没有进程监听时连接会立即被拒绝。
+    """
+    if not os.path.exists(path):
+        return False
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1)
+    try:
+        sock.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class GrpcTransport:
+    """
+    直接通过 grpcio 调用 com.ql.api.Api，每个进程复用同一个长连接。
+    """
+
+    def __init__(self):
+        if grpc is None:
+            raise ImportError("grpcio is not installed")
+        if not METHODS:
+            raise ImportError(f"cannot load {PROTO_PATH}")
+        self._lock = threading.Lock()
+        self._channel = None
+        self._stubs = {}
+        self._pid = None
+
+    @staticmethod
+    def _cert_dir() -> str:
+        data_dir = os.getenv("QL_DATA_DIR") or os.path.join(
+            os.getenv("QL_DIR", ""), "data"
+        )
+        return os.path.join(data_dir.rstrip("/"), "config", "grpc")
+
+    def _credentials(self):
+        cert_dir = self._cert_dir()
+        try:
+            with open(os.path.join(cert_dir, "ca.crt"), "rb") as f:
+                ca = f.read()
+            with open(os.path.join(cert_dir, "client.key"), "rb") as f:
+                key = f.read()
+            with open(os.path.join(cert_dir, "client.crt"), "rb") as f:
+                crt = f.read()
+        except OSError:
+            return None
+        return grpc.ssl_channel_credentials(
+            root_certificates=ca, private_key=key, certificate_chain=crt
+        )
+
+    def _get_channel(self):
+        # fork 后子进程不能复用父进程的连接
+        if self._channel is not None and self._pid == os.getpid():
+            return self._channel
+        with self._lock:
+            if self._channel is None or self._pid != os.getpid():
+                address = f"localhost:{os.getenv('GRPC_PORT') or '5500'}"
+                options = [("grpc.enable_http_proxy", 0)]
+                # 面板同时监听 unix socket，能连上时优先使用，省去 TCP 和 TLS 握手
+                socket_file = os.path.join(self._cert_dir(), "api.sock")
+                credentials = None
+                if socket_connectable(socket_file):
+                    address = f"unix:{socket_file}"
+                else:
+                    credentials = self._credentials()
+                if credentials is not None:
+                    self._channel = grpc.secure_channel(address, credentials, options)
+                else:
+                    self._channel = grpc.insecure_channel(address, options)
+                self._stubs = {}
+                self._pid = os.getpid()
+        return self._channel
+
+    def _stub(self, method: str):
+        channel = self._get_channel()
+        stub = self._stubs.get(method)
+        if stub is None:
+            if method in STREAM_METHODS:
+                request_type, response_type = STREAM_METHODS[method]
+                factory = channel.unary_stream
+            else:
+                request_type, response_type = METHODS[method]
+                factory = channel.unary_unary
+            rpc_name = method[0].upper() + method[1:]
+            stub = factory(
+                f"/{SERVICE}/{rpc_name}",
+                request_serializer=lambda message: encode(request_type, message),
+                response_deserializer=lambda data: decode(response_type, data),
+            )
+            self._stubs[method] = stub
+        return stub
+
+    def call(self, method: str, params: Dict = None, timeout: float = None) -> Dict:
+        try:
+            return self._stub(method)(params or {}, timeout=timeout or DEFAULT_TIMEOUT)
+        except grpc.RpcError as e:
+            raise Exception(f"{e.code().name}: {e.details()}") from None
+
+    def stream(
+        self, method: str, params: Dict = None, timeout: float = None
+    ) -> Iterator[Dict]:
+        # grpcio 在调用方取下一条时才接收消息，消费慢时由 HTTP/2 流控让服务端暂停发送
+        call = self._stub(method)(params or {}, timeout=timeout)
+        try:
+            yield from call
+        except grpc.RpcError as e:
+            raise Exception(f"{e.code().name}: {e.details()}") from None
+        finally:
+            call.cancel()
+
+    def close(self):
+        with self._lock:
+            if self._channel is not None and self._pid == os.getpid():
+                self._channel.close()
+            self._channel = None
+            self._stubs = {}
+
+
+def bench(count: int = 1000, concurrency: int = 10) -> None:
+    """
+    分别通过 grpcio 和常驻 node 进程并发调用 getEnvs，对比每秒调用次数。
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from client import NodeBridge
+
+    transports = {"bridge": NodeBridge}
+    if grpc is not None:
+        transports = {"grpc": GrpcTransport, **transports}
+    for name, factory in transports.items():
+        transport = factory()
+        try:
+            # 预热，建立连接后再计时
+            transport.call("getEnvs", {})
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(
+                    executor.map(
+                        lambda _: transport.call("getEnvs", {}), range(count)
+                    )
+                )
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name}: {count} 次调用耗时 {elapsed:.2f}s，"
+                f"{count / elapsed:.0f} 次/秒（并发 {concurrency}）"
+            )
+        except Exception as e:
+            print(f"{name}: 调用失败 {e}")
+        finally:
+            transport.close()
+
+
+if __name__ == "__main__":
+    # python3 client_grpc.py --bench [次数] [并发数]
+    import sys
+
+    args = sys.argv[1:]
+    if args[:1] == ["--bench"]:
+        bench(*(int(arg) for arg in args[1:3]))
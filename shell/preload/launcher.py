@@ -0,0 +1,465 @@
+"""
+常驻的 python 任务启动器。
+
+服务端预先导入常用模块后常驻，每个任务 fork 一个子进程执行，省去每次导入模块的耗时；
+客户端以 python3 -I -S 启动，把 argv、cwd、环境变量和标准输入输出的 fd 交给服务端，
+转发收到的信号并以子进程的退出码退出。服务端不可用时直接 exec 普通的 python3。
+
+    python3 -I -S launcher.py script.py [args...]   客户端，由 task 命令调用
+    python3 launcher.py --serve                      服务端，由客户端按需启动
+    python3 -I -S launcher.py --bench [次数] [脚本]  对比两种方式运行脚本的耗时
+"""
+
+# 客户端只导入内置模块，其余模块在服务端按需导入，尽量缩短客户端启动时间
+import _signal
+import _socket
+import marshal
+import os
+import struct
+import sys
+
+PRELOAD_DIR = os.path.dirname(os.path.abspath(__file__))
+SOCKET_PATH = os.getenv("QL_LAUNCHER_SOCKET") or os.path.join(
+    os.getenv("QL_DIR", ""), ".tmp", "py_launcher.sock"
+)
+LOCK_PATH = f"{SOCKET_PATH}.lock"
+# 服务端空闲超过该秒数后退出
+IDLE_TIMEOUT = float(os.getenv("QL_LAUNCHER_IDLE") or 3600)
+# 服务端预先导入的模块，只导入与环境变量无关的模块
+# grpc 在 fork 前导入后子进程无法安全使用，client 不预先导入
+PRELOAD_MODULES = (
+    "asyncio",
+    "concurrent.futures",
+    "json",
+    "sqlite3",
+    "ssl",
+    "requests",
+)
+# 启动服务端时去掉的环境变量，服务端不受启动它的任务影响，
+# sitecustomize 和警告过滤器由每个任务按自己的环境变量设置
+SERVER_IGNORED_ENV = ("PYTHONPATH", "PYTHONSTARTUP", "PYTHONWARNINGS", "PYTHONINSPECT")
+# 这些文件变化后服务端不再接受任务并退出，下次任务启动新版本
+WATCH_FILES = ("launcher.py", "sitecustomize.py", "client.py", "client_grpc.py")
+FORWARD_SIGNALS = (
+    _signal.SIGINT,
+    _signal.SIGTERM,
+    _signal.SIGHUP,
+    _signal.SIGQUIT,
+    _signal.SIGUSR1,
+    _signal.SIGUSR2,
+)
+
+
+def exec_python(argv):
+    os.execv(sys.executable, [sys.executable] + argv)
+
+
+def start_server():
+    import subprocess
+
+    env = dict(os.environ, QL_LAUNCHER_SERVER="1")
+    for name in SERVER_IGNORED_ENV:
+        env.pop(name, None)
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve"],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def read_line(sock, buffer):
+    while b"\n" not in buffer:
+        chunk = sock.recv(64)
+        if not chunk:
+            return b"", b""
+        buffer += chunk
+    line, _, rest = buffer.partition(b"\n")
+    return line, rest
+
+
+def launch(argv):
+    """
+    客户端：把任务交给服务端执行，服务端不可用时启动服务端并直接运行 python3。
+    """
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        sock.close()
+        start_server()
+        exec_python(argv)
+
+    payload = marshal.dumps(
+        {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    )
+    try:
+        sock.sendmsg(
+            [struct.pack("!Q", len(payload))],
+            [(_socket.SOL_SOCKET, _socket.SCM_RIGHTS, struct.pack("3i", 0, 1, 2))],
+        )
+        sock.sendall(payload)
+        line, buffer = read_line(sock, b"")
+    except OSError:
+        line = b""
+    if not line.startswith(b"pid "):
+        # 服务端正在重载或已退出，本次直接运行
+        sock.close()
+        exec_python(argv)
+    pid = int(line.split()[1])
+
+    def forward(signum, frame):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    for signum in FORWARD_SIGNALS:
+        _signal.signal(signum, forward)
+
+    line, _ = read_line(sock, buffer)
+    if not line.startswith(b"exit "):
+        sys.exit(1)
+    code = os.waitstatus_to_exitcode(int(line.split()[1]))
+    if code < 0:
+        # 子进程被信号终止时，以同样的信号结束自身
+        _signal.signal(-code, _signal.SIG_DFL)
+        os.kill(os.getpid(), -code)
+        code = 128 - code
+    sys.exit(code)
+
+
+def watch_mtimes():
+    mtimes = []
+    for name in WATCH_FILES:
+        try:
+            mtimes.append(os.stat(os.path.join(PRELOAD_DIR, name)).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return mtimes
+
+
+def read_request(conn):
+    import socket
+
+    conn.settimeout(5)
+    try:
+        header, fds, _, _ = socket.recv_fds(conn, 8, 3)
+        if len(header) != 8 or len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            return None
+        (size,) = struct.unpack("!Q", header)
+        chunks = []
+        while size > 0:
+            chunk = conn.recv(min(size, 1 << 20))
+            if not chunk:
+                raise OSError("connection closed")
+            chunks.append(chunk)
+            size -= len(chunk)
+    except (OSError, ValueError):
+        return None
+    conn.settimeout(None)
+    request = marshal.loads(b"".join(chunks))
+    request["fds"] = fds
+    return request
+
+
+def reap(children):
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+        conn = children.pop(pid, None)
+        if conn is None:
+            continue
+        try:
+            conn.sendall(f"exit {status}\n".encode())
+        except OSError:
+            pass
+        conn.close()
+
+
+def serve():
+    """
+    服务端主循环。在 fork 出的子进程中返回 (连接, 请求)，服务端退出时返回 None。
+    """
+    import fcntl
+    import importlib
+    import select
+    import signal
+    import socket
+    import time
+
+    os.makedirs(os.path.dirname(SOCKET_PATH), exist_ok=True)
+    lock_fd = os.open(LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # 已有服务端在运行
+        return None
+
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+    mtimes = watch_mtimes()
+
+    try:
+        os.unlink(SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        server.bind(SOCKET_PATH)
+    finally:
+        os.umask(umask)
+    server.listen(128)
+
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    children = {}
+    last_active = time.monotonic()
+    while server is not None or children:
+        if (
+            server is not None
+            and not children
+            and time.monotonic() - last_active > IDLE_TIMEOUT
+        ):
+            break
+        watched = [wake_r] if server is None else [server, wake_r]
+        readable, _, _ = select.select(watched, [], [], min(IDLE_TIMEOUT, 60))
+        if wake_r in readable:
+            try:
+                while os.read(wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+        reap(children)
+        if server is None or server not in readable:
+            continue
+
+        conn, _ = server.accept()
+        last_active = time.monotonic()
+        if watch_mtimes() != mtimes:
+            # 代码已更新：拒绝新任务，等已启动的任务结束后退出
+            conn.close()
+            server.close()
+            server = None
+            os.unlink(SOCKET_PATH)
+            os.close(lock_fd)
+            lock_fd = None
+            continue
+
+        request = read_request(conn)
+        if request is None:
+            conn.close()
+            continue
+
+        pid = os.fork()
+        if pid == 0:
+            server.close()
+            os.close(wake_r)
+            os.close(wake_w)
+            os.close(lock_fd)
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            for other in children.values():
+                other.close()
+            return conn, request
+
+        for fd in request["fds"]:
+            os.close(fd)
+        children[pid] = conn
+        try:
+            conn.sendall(f"pid {pid}\n".encode())
+        except OSError:
+            pass
+
+    if server is not None:
+        server.close()
+        os.unlink(SOCKET_PATH)
+    return None
+
+
+def reopen_stdio():
+    """
+    fork 前的标准输入输出指向服务端，替换为任务传来的 fd 后重新创建。
+    """
+    import io
+    import locale
+
+    unbuffered = bool(os.getenv("PYTHONUNBUFFERED"))
+    encoding = os.getenv("PYTHONIOENCODING") or locale.getpreferredencoding(False)
+    sys.stdin = sys.__stdin__ = io.TextIOWrapper(
+        io.BufferedReader(io.FileIO(0, "r", closefd=False)), encoding=encoding
+    )
+    for fd, name in ((1, "stdout"), (2, "stderr")):
+        raw = io.FileIO(fd, "w", closefd=False)
+        stream = io.TextIOWrapper(
+            raw if unbuffered else io.BufferedWriter(raw),
+            encoding=encoding,
+            errors="backslashreplace" if name == "stderr" else "strict",
+            line_buffering=unbuffered or name == "stderr" or os.isatty(fd),
+            write_through=unbuffered,
+        )
+        setattr(sys, name, stream)
+        setattr(sys, f"__{name}__", stream)
+
+
+def apply_python_env():
+    """
+    服务端启动时读取的 PYTHON* 环境变量不随任务变化，按任务的环境变量重新设置运行时可以修改的选项，
+    PYTHONUNBUFFERED 和 PYTHONIOENCODING 在 reopen_stdio() 中处理。
+    """
+    import warnings
+
+    sys.dont_write_bytecode = bool(os.getenv("PYTHONDONTWRITEBYTECODE"))
+    options = [item for item in os.getenv("PYTHONWARNINGS", "").split(",") if item]
+    if options:
+        sys.warnoptions.extend(options)
+        # 与解释器启动时处理 -W 和 PYTHONWARNINGS 的方式相同
+        warnings._processoptions(options)
+
+
+def run_child(conn, request, base_path):
+    """
+    在 fork 出的子进程中还原任务的运行环境并执行脚本。
+    """
+    import runpy
+    import signal
+    import threading
+
+    fds = request["fds"]
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+    for fd in set(fds):
+        if fd > 2:
+            os.close(fd)
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    argv = request["argv"]
+    entries = [p for p in os.getenv("PYTHONPATH", "").split(os.pathsep) if p]
+    sys.path[:] = (
+        [os.path.dirname(os.path.abspath(argv[0]))]
+        + entries
+        + [p for p in base_path if p not in entries]
+    )
+    sys.argv = argv
+    reopen_stdio()
+    apply_python_env()
+
+    def watch_client():
+        # 客户端被强制结束时连接断开，子进程随之退出
+        try:
+            while conn.recv(1024):
+                pass
+        except OSError:
+            pass
+        os.kill(os.getpid(), signal.SIGTERM)
+
+    threading.Thread(target=watch_client, daemon=True).start()
+
+    load_sitecustomize(entries)
+    runpy.run_path(argv[0], run_name="__main__")
+
+
+def load_sitecustomize(entries):
+    """
+    与直接运行 python3 一致，执行任务的 PYTHONPATH 中第一个 sitecustomize.py，
+    任务环境中没有 QL_LAUNCHER_SERVER，导入时即执行 bootstrap()。
+    """
+    import importlib.util
+
+    for entry in entries:
+        path = os.path.join(entry, "sitecustomize.py")
+        if not os.path.isfile(path):
+            continue
+        spec = importlib.util.spec_from_file_location("sitecustomize", path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["sitecustomize"] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception as error:
+            del sys.modules["sitecustomize"]
+            print(f"Error in sitecustomize: {error!r}", file=sys.stderr)
+        return
+
+
+def bench(count, script=None):
+    """
+    分别用 python3 和启动器运行同一脚本，对比启动耗时。
+    默认脚本只导入预加载的模块，需以 -I -S 运行，避免 sitecustomize 修改当前进程的 PYTHONPATH。
+    """
+    import statistics
+    import subprocess
+    import tempfile
+    import time
+
+    temp = None
+    if script is None:
+        with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+            for name in PRELOAD_MODULES:
+                f.write(f"try:\n    import {name}\nexcept ImportError:\n    pass\n")
+        script = temp = f.name
+    commands = {
+        "python3": [sys.executable, script],
+        "launcher": [sys.executable, "-I", "-S", os.path.abspath(__file__), script],
+    }
+    try:
+        # 首次调用会启动服务端，等待其就绪
+        subprocess.run(commands["launcher"], stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            if os.path.exists(SOCKET_PATH):
+                break
+            time.sleep(0.1)
+
+        for name, command in commands.items():
+            times = []
+            for _ in range(count):
+                start = time.perf_counter()
+                subprocess.run(command, stdout=subprocess.DEVNULL)
+                times.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{name}: 平均 {statistics.mean(times):.1f}ms, "
+                f"中位数 {statistics.median(times):.1f}ms, 最大 {max(times):.1f}ms"
+            )
+    finally:
+        if temp:
+            os.remove(temp)
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--serve"]:
+        pythonpath = [p for p in os.getenv("PYTHONPATH", "").split(os.pathsep) if p]
+        base_path = [p for p in sys.path[1:] if p not in pythonpath]
+        result = serve()
+        if result is not None:
+            run_child(*result, base_path)
+        return
+    if args[:1] == ["--bench"]:
+        bench(int(args[1]) if len(args) > 1 else 20, *args[2:3])
+        return
+    # 只接管直接运行脚本文件的情况，-c、-m 等参数交给 python3
+    if not args or args[0].startswith("-") or not os.path.isfile(args[0]):
+        exec_python(args)
+    launch(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,14 @@
 import os
 import re
 import subprocess
-import json
 import builtins
+import importlib
+import json
+import marshal
 import sys
-import env
 import signal
-from client import Client
+import threading
+import time
 
 
 def try_parse_int(value):
@@ -36,55 +38,204 @@ def expand_range(range_str, max_value):
     return result
 
 
+PRELOAD_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_FILE = os.path.join(PRELOAD_DIR, "env.json")
+ENV_CACHE_FILE = os.path.join(PRELOAD_DIR, "__pycache__", "env.marshal")
+
+
+def read_env_file():
+    """
+    读取面板生成的 env.json，首行为版本号，其余为变量 JSON。
+    版本号与缓存一致时直接读取 marshal 缓存，不再解析 JSON。
+    """
+    with open(ENV_FILE, "rb") as f:
+        version = f.readline().strip()
+        try:
+            with open(ENV_CACHE_FILE, "rb") as cache:
+                if cache.readline().strip() == version:
+                    return version, marshal.load(cache)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+        envs = json.loads(f.read())
+
+    try:
+        os.makedirs(os.path.dirname(ENV_CACHE_FILE), exist_ok=True)
+        temp_file = f"{ENV_CACHE_FILE}.{os.getpid()}"
+        with open(temp_file, "wb") as cache:
+            cache.write(version + b"\n")
+            marshal.dump(envs, cache)
+        os.replace(temp_file, ENV_CACHE_FILE)
+    except OSError:
+        pass
+    return version, envs
+
+
+# 最近一次应用到 os.environ 的 env.json 内容，用于计算变量的变化
+ENV_VERSION = None
+ENV_SNAPSHOT = {}
+
+
+def load_env():
+    global ENV_VERSION, ENV_SNAPSHOT
+    try:
+        ENV_VERSION, envs = read_env_file()
+    except FileNotFoundError:
+        # 兼容旧版本面板生成的 env.py
+        try:
+            import env
+        except ImportError:
+            pass
+        return
+    ENV_SNAPSHOT = envs
+    os.environ.update(envs)
+
+
+ENV_WATCH_INTERVAL = float(os.getenv("QL_ENV_WATCH_INTERVAL") or 5)
+# {变量名: [回调]}，变量名为 "*" 时任意变量变化都会回调
+env_callbacks = {}
+env_watch_lock = threading.Lock()
+env_watcher = None
+
+
+def on_env_change(name, fn):
+    """
+    注册变量变化的回调 fn(name, value, old_value)，变量被删除时 value 为 None。
+    回调在监听线程中执行，注册后自动开始监听。
+    """
+    with env_watch_lock:
+        env_callbacks.setdefault(name, []).append(fn)
+    watch_env()
+    return fn
+
+
+def watch_env(interval=None):
+    """
+    启动后台线程，面板修改环境变量后同步更新当前进程的 os.environ。
+    """
+    global env_watcher, ENV_WATCH_INTERVAL
+    if interval:
+        ENV_WATCH_INTERVAL = float(interval)
+    with env_watch_lock:
+        if env_watcher is None or not env_watcher.is_alive():
+            env_watcher = threading.Thread(
+                target=poll_env, name="env-watcher", daemon=True
+            )
+            env_watcher.start()
+
+
+def env_stamp():
+    try:
+        stat = os.stat(ENV_FILE)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def poll_env():
+    # 标准库没有 inotify，定时比较 env.json 的修改时间，变化时再比较首行版本号
+    stamp = env_stamp()
+    while True:
+        time.sleep(ENV_WATCH_INTERVAL)
+        current = env_stamp()
+        if current is None or current == stamp:
+            continue
+        stamp = current
+        try:
+            reload_env()
+        except Exception as error:
+            print(f"reload env error: {error}")
+
+
+def reload_env():
+    """
+    重新读取 env.json，只应用与上次相比发生变化的变量，
+    保留 task_before 等在当前进程中设置的其他变量。
+    """
+    global ENV_VERSION, ENV_SNAPSHOT
+    try:
+        version, envs = read_env_file()
+    except (OSError, ValueError):
+        # 面板正在写入文件，等待下次检查
+        return
+    if version == ENV_VERSION:
+        return
+
+    env_param = os.getenv("envParam")
+    changes = []
+    for name in set(ENV_SNAPSHOT) | set(envs):
+        old, value = ENV_SNAPSHOT.get(name), envs.get(name)
+        if old == value:
+            continue
+        if value is not None and name == env_param and SELECTED_ACCOUNTS:
+            # 与启动时一致，只保留 numParam 选中的账号
+            array = value.split("&")
+            value = "&".join(array[i - 1] for i in SELECTED_ACCOUNTS if i <= len(array))
+        old = os.environ.get(name)
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+        changes.append((name, value, old))
+    ENV_VERSION, ENV_SNAPSHOT = version, envs
+
+    for name, value, old in changes:
+        with env_watch_lock:
+            callbacks = env_callbacks.get(name, []) + env_callbacks.get("*", [])
+        for fn in callbacks:
+            try:
+                fn(name, value, old)
+            except Exception as error:
+                print(f"env change callback error: {error}")
+
+
+# 单个环境变量超过该长度时无法通过 execve 传给子进程 (MAX_ARG_STRLEN)
+MAX_ENV_ENTRY_SIZE = 128 * 1024
+
+
 def run():
+    task_before = os.getenv("task_before")
     try:
         prev_pythonpath = os.getenv("PREV_PYTHONPATH", "")
         os.environ["PYTHONPATH"] = prev_pythonpath
 
         split_str = "__sitecustomize__"
         file_name = sys.argv[0].replace(f"{os.getenv('dir_scripts')}/", "")
-        
-        # 创建临时文件路径
-        temp_file = f"/tmp/env_{os.getpid()}.json"
-        
+
         # 构建命令数组
-        commands = [
-            f'source {os.getenv("file_task_before")} {file_name}'
-        ]
-        
-        task_before = os.getenv("task_before")
+        commands = [f'source {os.getenv("file_task_before")} {file_name}']
+
         if task_before:
-            escaped_task_before = task_before.replace('"', '\\"').replace("$", "\\$")
+            escaped_task_before = task_before.replace("'", "'\\''")
             commands.append(f"eval '{escaped_task_before}'")
             print("执行前置命令\n")
-            
-        commands.append(f"echo -e '{split_str}'")
-        
-        # 修改 Python 命令，使用单行并正确处理引号
-        python_cmd = f"python3 -c 'import os,json; f=open(\\\"{temp_file}\\\",\\\"w\\\"); json.dump(dict(os.environ),f); f.close()'"
-        commands.append(python_cmd)
-        
-        command = " && ".join(cmd for cmd in commands if cmd)
-        command = f'bash -c "{command}"'
 
-        res = subprocess.check_output(command, shell=True, encoding="utf-8")
-        output = res.split(split_str)[0]
+        commands.append(f"echo -e '{split_str}'")
+        # 以 NUL 分隔输出执行后的环境变量，直接从管道读取，无需再启动 python 和临时文件
+        commands.append("{ env -0 2>/dev/null || cat /proc/self/environ; }")
 
-        try:
-            with open(temp_file, 'r') as f:
-                env_json = json.loads(f.read())
+        command = " && ".join(cmd for cmd in commands if cmd)
 
-            for key, value in env_json.items():
-                os.environ[key] = value
+        # 过长的变量无法传给 bash，保留在当前进程中即可
+        child_env = {
+            key: value
+            for key, value in os.environ.items()
+            if len(key) + len(value) + 2 <= MAX_ENV_ENTRY_SIZE
+        }
+        res = subprocess.run(
+            ["bash", "-c", command],
+            stdout=subprocess.PIPE,
+            env=child_env,
+            check=True,
+        )
+        output, _, env_output = res.stdout.partition(f"{split_str}\n".encode())
 
-            os.unlink(temp_file)
-        except Exception as json_error:
-            print(f"\ue926 Failed to parse environment variables: {json_error}")
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+        for item in env_output.split(b"\0"):
+            key, sep, value = item.partition(b"=")
+            if sep and key:
+                os.environ[os.fsdecode(key)] = os.fsdecode(value)
 
+        output = output.decode("utf-8", errors="replace")
         if len(output) > 0:
             print(output)
         if task_before:
@@ -95,11 +246,13 @@ def run():
         if task_before:
             print("执行前置命令结束\n")
     except OSError as error:
-        error_message = str(error)
-        if "Argument list too long" not in error_message:
+        if "Argument list too long" in str(error):
+            print(
+                f"\ue926 run task before error: environment variables are too large, "
+                f"task_before skipped: {error}"
+            )
+        else:
             print(f"\ue926 run task before error: {error}")
-        # else:
-            # environment variable is too large
         if task_before:
             print("执行前置命令结束\n")
     except Exception as error:
@@ -113,29 +266,239 @@ def run():
     num_param = os.getenv("numParam")
 
     if env_param and num_param:
+        global SELECTED_ACCOUNTS
         array = (os.getenv(env_param) or "").split("&")
         run_arr = expand_range(num_param, len(array))
-        array_run = [array[i - 1] for i in run_arr if i - 1 < len(array) and i > 0]
+        SELECTED_ACCOUNTS = [i for i in run_arr if i - 1 < len(array) and i > 0]
+        array_run = [array[i - 1] for i in SELECTED_ACCOUNTS]
         env_str = "&".join(array_run)
         os.environ[env_param] = env_str
 
 
+# numParam 选中的账号编号（从 1 开始），与 envParam 变量中剩余的账号一一对应
+SELECTED_ACCOUNTS = None
+
+
+def cpu_quota():
+    """
+    容器的 CPU 配额（向上取整），未限制时返回 CPU 核数。
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return max(1, -(-int(quota) // int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return max(1, -(-quota // period))
+    except (OSError, ValueError):
+        pass
+    return os.cpu_count() or 1
+
+
+NOTIFY_MODULES = ("__ql_notify__", "notify")
+
+
+def take_notify():
+    """
+    进程池的子进程通过 os._exit 退出，不会执行 atexit，取出合并模式和
+    SMTP 批量模式下缓冲的通知，随结果交回父进程，与其他账号的通知一起发送。
+    """
+    pending = {}
+    for name in NOTIFY_MODULES:
+        take = getattr(sys.modules.get(name), "take_pending", None)
+        if take is None:
+            continue
+        try:
+            items = take()
+        except Exception as error:
+            print(f"take notify error: {error}")
+            continue
+        if any(items.values()):
+            pending[name] = items
+    return pending
+
+
+def restore_notify(pending):
+    for name, items in pending.items():
+        try:
+            # 子进程中才导入的通知模块，父进程中可能还没有导入
+            module = sys.modules.get(name) or importlib.import_module(name)
+            module.restore_pending(items)
+        except Exception as error:
+            print(f"restore notify error: {error}")
+
+
+def run_account(fn, env_name, number, account):
+    """
+    在线程或子进程中执行单个账号，异常随结果一起返回。
+    """
+    in_child = os.getpid() != MAIN_PID
+    if env_name and in_child:
+        # 子进程内可以安全地只保留当前账号，兼容直接读取环境变量的脚本
+        os.environ[env_name] = account
+    item = {"number": number, "account": account, "result": None, "error": None}
+    try:
+        item["result"] = fn(account)
+    except Exception as error:
+        item["error"] = error
+    finally:
+        if in_child:
+            item["notify"] = take_notify()
+    return item
+
+
+def for_each_account(fn, workers=None, env_name=None, use_process=False):
+    """
+    按 & 拆分账号变量（默认为 envParam 指定的变量），并发执行 fn(account)。
+    返回与账号顺序一致的 [{"number", "account", "result", "error"}]，
+    number 为账号在原变量中的编号，单个账号的异常不影响其他账号。
+    workers 默认按容器 CPU 配额计算，线程池为配额的 4 倍，进程池与配额相同。
+    use_process 为 True 时 fn 及其返回值需要可以被 pickle，fn 应定义在模块顶层，
+    不能是 lambda 或嵌套函数；子进程中缓冲的通知交回父进程合并发送。
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    env_name = env_name or os.getenv("envParam")
+    if not env_name:
+        raise Exception("for_each_account() requires env_name or envParam")
+    accounts = (os.getenv(env_name) or "").split("&")
+    numbers = list(range(1, len(accounts) + 1))
+    if env_name == os.getenv("envParam") and SELECTED_ACCOUNTS:
+        numbers = SELECTED_ACCOUNTS
+    jobs = [(n, a) for n, a in zip(numbers, accounts) if a]
+    if not jobs:
+        return []
+
+    quota = cpu_quota()
+    workers = min(workers or (quota if use_process else quota * 4), len(jobs))
+    if use_process:
+        import multiprocessing
+        import pickle
+
+        try:
+            pickle.dumps(fn)
+        except Exception as error:
+            raise Exception(
+                "for_each_account(use_process=True) requires a picklable fn, "
+                f"define it at module level: {error}"
+            ) from None
+
+        # fork 出的子进程直接继承已完成的预加载，不再重复执行 task_before
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("fork")
+        )
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account")
+    with executor:
+        futures = [
+            executor.submit(run_account, fn, env_name, number, account)
+            for number, account in jobs
+        ]
+        items = [future.result() for future in futures]
+    for item in items:
+        restore_notify(item.pop("notify", {}))
+    return items
+
+
+MAIN_PID = os.getpid()
+
+
 def handle_sigterm(signum, frame):
     sys.exit(15)
 
 
-try:
-    signal.signal(signal.SIGTERM, handle_sigterm)
+class LazyApi:
+    """
+    首次访问属性时才创建真正的实例，大部分脚本不会用到 QLAPI，
+    无需在每次任务启动时导入 client 和 __ql_notify__。
+    """
 
-    run()
+    def __init__(self, factory):
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
 
-    from __ql_notify__ import send
+    def _get_instance(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get_instance(), name)
+
+    def __dir__(self):
+        return dir(self._get_instance())
+
+
+def create_api():
+    from client import Client
 
     class BaseApi(Client):
         def notify(self, *args, **kwargs):
+            from __ql_notify__ import send
+
             return send(*args, **kwargs)
 
-    QLAPI = BaseApi()
-    builtins.QLAPI = QLAPI
-except Exception as error:
-    print(f"run builtin code error: {error}\n")
+        def for_each_account(self, fn, workers=None, env_name=None, use_process=False):
+            return for_each_account(fn, workers, env_name, use_process)
+
+        def on_env_change(self, name, fn):
+            return on_env_change(name, fn)
+
+        def watch_env(self, interval=None):
+            return watch_env(interval)
+
+        def notify_digest(self, enabled=True):
+            from __ql_notify__ import enable_digest
+
+            return enable_digest(enabled)
+
+        def flush_notify(self):
+            from __ql_notify__ import flush_digest
+
+            return flush_digest()
+
+    return BaseApi()
+
+
+def create_async_api():
+    from client import AsyncClient
+
+    class AsyncBaseApi(AsyncClient):
+        async def notify(self, *args, **kwargs):
+            from __ql_notify__ import async_send
+
+            return await async_send(*args, **kwargs)
+
+    return AsyncBaseApi(builtins.QLAPI._get_instance())
+
+
+def bootstrap():
+    global MAIN_PID
+    MAIN_PID = os.getpid()
+    try:
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+        load_env()
+        run()
+        if os.getenv("QL_ENV_WATCH") == "true":
+            watch_env()
+
+        builtins.QLAPI = LazyApi(create_api)
+        builtins.QLAPI_ASYNC = LazyApi(create_async_api)
+    except Exception as error:
+        print(f"run builtin code error: {error}\n")
+
+
+# launcher.py 的常驻进程只预加载模块，在 fork 出的任务进程中再执行 bootstrap()
+if os.getenv("QL_LAUNCHER_SERVER") != "1":
+    bootstrap()
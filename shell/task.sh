@@ -22,6 +22,8 @@ define_program() {
   local file_param=$1
   if [[ $file_param == *.js ]] || [[ $file_param == *.mjs ]]; then
     which_program="node"
+  elif [[ $file_param == *.py ]] && [[ ${PythonLauncher:=} == "true" ]]; then
+    which_program="python3 -I -S $dir_preload/launcher.py"
   elif [[ $file_param == *.py ]] || [[ $file_param == *.pyc ]]; then
     which_program="python3"
   elif [[ $file_param == *.sh ]]; then
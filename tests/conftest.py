@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 测试直接导入 shell/preload 和 sample 下的模块，不依赖青龙运行环境
+sys.path[:0] = [os.path.join(ROOT, "shell", "preload"), os.path.join(ROOT, "sample")]
+for name in ("QL_DIR", "QL_DATA_DIR"):
+    os.environ.pop(name, None)
+
+import notify  # noqa: E402
+
+
+@pytest.fixture
+def isolation_channel(monkeypatch):
+    seen = []
+
+    def send(title, content):
+        time.sleep(0.001)
+        seen.append((title, notify.push_config.get("TEST_KEY")))
+
+    monkeypatch.setitem(
+        notify.CHANNELS,
+        "test_isolation",
+        notify.Channel("test_isolation", send, ("TEST_KEY",)),
+    )
+    notify.config_changed()
+    yield seen
+    notify.config_changed()
@@ -0,0 +1,151 @@
+import gc
+import time
+
+import pytest
+
+import client as client_module
+from client import Client, NodeBridge, ResponseCache
+
+
+class FakeTransport:
+    """
+    按方法返回预设的响应，记录每次调用。
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def call(self, method, params=None, timeout=None):
+        self.calls.append(method)
+        response = self.responses[method]
+        if isinstance(response, Exception):
+            raise response
+        return response() if callable(response) else response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    def create(responses, cache_ttl=60):
+        client = Client(cache_ttl=cache_ttl)
+        client._transport = FakeTransport(responses)
+        client._transport_ready = True
+        return client
+
+    return create
+
+
+def test_response_cache_expires_and_evicts(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10, maxsize=2)
+    for name in ("a", "b", "c"):
+        cache.set(name, {"name": name}, cache.generation)
+    assert cache.get("a") is ResponseCache.MISSING
+    assert cache.get("b") == {"name": "b"}
+    now[0] = 10
+    assert cache.get("c") is ResponseCache.MISSING
+    assert cache.stats()["hits"] == 1
+
+
+def test_response_cache_returns_copies():
+    cache = ResponseCache(ttl=10)
+    cache.set("k", {"data": [1]}, cache.generation)
+    cache.get("k")["data"].append(2)
+    assert cache.get("k") == {"data": [1]}
+
+
+def test_response_cache_drops_results_from_before_clear():
+    cache = ResponseCache(ttl=10)
+    generation = cache.generation
+    cache.clear()
+    cache.set("k", {"code": 200}, generation)
+    assert cache.get("k") is ResponseCache.MISSING
+
+
+def test_successful_reads_are_cached(client):
+    client = client({"getEnvs": {"code": 200, "data": []}})
+    assert client.getEnvs({}) == {"code": 200, "data": []}
+    assert client.getEnvs({}) == {"code": 200, "data": []}
+    assert client._transport.calls == ["getEnvs"]
+    assert client.cacheStats()["hits"] == 1
+
+
+def test_error_responses_are_not_cached(client):
+    responses = iter([{"code": 500, "message": "busy"}, {"code": 200, "data": []}])
+    client = client({"getEnvs": lambda: next(responses)})
+    assert client.getEnvs({})["code"] == 500
+    assert client.getEnvs({})["code"] == 200
+    assert client.getEnvs({})["code"] == 200
+    assert client._transport.calls == ["getEnvs", "getEnvs"]
+
+
+def test_exceptions_are_not_cached(client):
+    client = client({"getEnvById": RuntimeError("Error: unavailable")})
+    for _ in range(2):
+        with pytest.raises(Exception, match="unavailable"):
+            client.getEnvById({"id": 1})
+    assert client._transport.calls == ["getEnvById", "getEnvById"]
+
+
+def test_env_writes_clear_the_cache(client):
+    client = client(
+        {
+            "getEnvs": {"code": 200, "data": []},
+            "updateEnvs": {"code": 200, "data": []},
+            "systemNotify": {"code": 200},
+        }
+    )
+    client.getEnvs({})
+    client.systemNotify({"title": "t", "content": "c"})
+    client.getEnvs({})
+    client.updateEnvs({"ids": [1], "name": "A", "value": "1"})
+    client.getEnvs({})
+    assert client._transport.calls == [
+        "getEnvs",
+        "systemNotify",
+        "updateEnvs",
+        "getEnvs",
+    ]
+
+
+def test_cache_is_disabled_by_default(client):
+    client = client({"getEnvs": {"code": 200, "data": []}}, cache_ttl=0)
+    client.getEnvs({})
+    client.getEnvs({})
+    assert client._transport.calls == ["getEnvs", "getEnvs"]
+    assert client.cacheStats() is None
+
+
+def test_unused_node_bridges_are_released():
+    bridge = NodeBridge()
+    assert bridge in client_module._bridges
+    del bridge
+    gc.collect()
+    assert len(client_module._bridges) == 0
+
+
+class FakeStream:
+    def __init__(self, error):
+        self.error = error
+
+    def stream(self, method, params=None, timeout=None):
+        yield {"data": b"line\n", "offset": 5}
+        raise self.error
+
+    def close(self):
+        pass
+
+
+def test_tail_cron_log_converts_errors_raised_while_iterating():
+    client = Client()
+    client._transport = FakeStream(RuntimeError("Error: NOT_FOUND\n    at stack"))
+    client._transport_ready = True
+    chunks = client.tailCronLog({"id": 1})
+    assert next(chunks) == {"data": b"line\n", "offset": 5}
+    with pytest.raises(Exception, match="^NOT_FOUND$") as info:
+        next(chunks)
+    assert type(info.value) is Exception
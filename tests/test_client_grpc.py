@@ -0,0 +1,148 @@
+import os
+import socket
+
+import pytest
+
+import client_grpc
+from client_grpc import ENUMS, MESSAGES, METHODS, STREAM_METHODS, decode, encode
+
+
+def sample_value(type_name, depth=0):
+    if type_name == "int32":
+        return -7
+    if type_name == "int64":
+        # 与 client.js 的 longs: String 一致，int64 解码为字符串
+        return "1234567890123"
+    if type_name == "bool":
+        return True
+    if type_name == "string":
+        return "青龙 ql"
+    if type_name == "bytes":
+        return b"\x00\xff\n"
+    if type_name in ENUMS:
+        return ENUMS[type_name][-1]
+    return sample_message(type_name, depth + 1)
+
+
+def sample_message(message_type, depth=0):
+    message = {}
+    for _, name, type_name, label in MESSAGES[message_type]:
+        if type_name in MESSAGES and depth > 2:
+            continue
+        value = sample_value(type_name, depth)
+        message[name] = [value, value] if label == "repeated" else value
+    return message
+
+
+def test_parse_proto():
+    messages, enums, methods, stream_methods = client_grpc.parse_proto(
+        """
+        syntax = "proto3";
+        // 注释中的 message Ignored { int32 a = 1; } 会被忽略
+        enum Mode { b = 1; a = 0; }
+        message Item { optional int32 id = 1; repeated string tags = 2; Mode mode = 3; }
+        service Api {
+          rpc GetItem(Item) returns (Item) {}
+          rpc TailItem(Item) returns (stream Item) {}
+        }
+        """
+    )
+    assert messages == {
+        "Item": [
+            (1, "id", "int32", "optional"),
+            (2, "tags", "string", "repeated"),
+            (3, "mode", "Mode", ""),
+        ]
+    }
+    assert enums == {"Mode": ["a", "b"]}
+    assert methods == {"getItem": ("Item", "Item")}
+    assert stream_methods == {"tailItem": ("Item", "Item")}
+
+
+def test_schema_matches_api_proto():
+    with open(client_grpc.PROTO_PATH, encoding="utf-8") as f:
+        text = f.read()
+    assert len(METHODS) + len(STREAM_METHODS) == text.count(" rpc ")
+    assert STREAM_METHODS == {"tailCronLog": ("TailCronLogRequest", "CronLogChunk")}
+    for request_type, response_type in [*METHODS.values(), *STREAM_METHODS.values()]:
+        assert request_type in MESSAGES and response_type in MESSAGES
+    for fields in MESSAGES.values():
+        assert len({number for number, *_ in fields}) == len(fields)
+        for _, _, type_name, _ in fields:
+            assert type_name in client_grpc._SCALARS | set(MESSAGES) | set(ENUMS)
+
+
+def test_round_trip_every_message():
+    for message_type in MESSAGES:
+        message = sample_message(message_type)
+        assert decode(message_type, encode(message_type, message)) == message
+
+
+def test_wire_format():
+    # 与 protobuf 官方编码一致的字节
+    assert encode("EnvItem", {"id": 150}) == bytes.fromhex("089601")
+    assert encode("EnvItem", {"name": "testing"}) == b"\x12\x07testing"
+    assert encode("DeleteEnvsRequest", {"ids": [1, 2, 300]}) == bytes.fromhex(
+        "0a040102ac02"
+    )
+    assert encode("EnvItem", {"id": -1}) == bytes.fromhex("08ffffffffffffffffff01")
+
+
+def test_implicit_and_optional_defaults():
+    # proto3 隐式字段的默认值不编码，显式 optional 字段保留 0
+    assert encode("GetEnvsRequest", {"searchValue": ""}) == b""
+    assert encode("GetCronsRequest", {"afterId": 0}) == bytes.fromhex("2000")
+    assert decode("Response", b"") == {"code": 0}
+    assert decode("GetCronsRequest", bytes.fromhex("2000")) == {"afterId": 0}
+
+
+def test_decode_skips_unknown_fields():
+    data = encode("Response", {"code": 200, "message": "ok"})
+    # 字段 9：varint、64 位、长度前缀、32 位
+    unknown = bytes.fromhex("4801") + bytes.fromhex("49") + bytes(8)
+    unknown += bytes.fromhex("4a03616263") + bytes.fromhex("4d") + bytes(4)
+    assert decode("Response", unknown + data) == {"code": 200, "message": "ok"}
+
+
+def test_unpacked_repeated_scalars():
+    # 旧版本的编码器可能不使用 packed 编码
+    assert decode("DeleteEnvsRequest", bytes.fromhex("08010802")) == {"ids": [1, 2]}
+
+
+@pytest.fixture
+def socket_file(monkeypatch, tmp_path):
+    monkeypatch.setenv("QL_DATA_DIR", str(tmp_path))
+    path = tmp_path / "config" / "grpc" / "api.sock"
+    path.parent.mkdir(parents=True)
+    return str(path)
+
+
+def channel_address(monkeypatch):
+    addresses = []
+
+    def insecure_channel(address, options=None):
+        addresses.append(address)
+        return object()
+
+    monkeypatch.setattr(client_grpc.grpc, "insecure_channel", insecure_channel)
+    client_grpc.GrpcTransport()._get_channel()
+    return addresses[0]
+
+
+def test_stale_socket_falls_back_to_tcp(socket_file, monkeypatch):
+    # 绑定后不监听，与面板异常退出后残留的 socket 文件相同
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(socket_file)
+    sock.close()
+    assert os.path.exists(socket_file)
+    assert not client_grpc.socket_connectable(socket_file)
+    monkeypatch.setenv("GRPC_PORT", "5599")
+    assert channel_address(monkeypatch) == "localhost:5599"
+
+
+def test_listening_socket_is_preferred(socket_file, monkeypatch):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.bind(socket_file)
+        sock.listen()
+        assert client_grpc.socket_connectable(socket_file)
+        assert channel_address(monkeypatch) == f"unix:{socket_file}"
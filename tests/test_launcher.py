@@ -0,0 +1,51 @@
+import sys
+import warnings
+
+import pytest
+
+import launcher
+
+
+@pytest.fixture
+def python_env(monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", sys.dont_write_bytecode)
+    monkeypatch.setattr(sys, "warnoptions", [])
+    for name in ("PYTHONDONTWRITEBYTECODE", "PYTHONWARNINGS"):
+        monkeypatch.delenv(name, raising=False)
+    with warnings.catch_warnings():
+        yield monkeypatch
+
+
+def test_task_env_sets_warning_filters(python_env):
+    python_env.setenv("PYTHONWARNINGS", "error::UserWarning,")
+    launcher.apply_python_env()
+    assert sys.warnoptions == ["error::UserWarning"]
+    with pytest.raises(UserWarning):
+        warnings.warn("x", UserWarning)
+
+
+def test_task_env_sets_dont_write_bytecode(python_env):
+    launcher.apply_python_env()
+    assert sys.dont_write_bytecode is False
+    python_env.setenv("PYTHONDONTWRITEBYTECODE", "1")
+    launcher.apply_python_env()
+    assert sys.dont_write_bytecode is True
+
+
+def test_server_env_drops_task_specific_variables(monkeypatch):
+    started = {}
+
+    class Popen:
+        def __init__(self, args, env, **kwargs):
+            started.update(args=args, env=env)
+
+    monkeypatch.setattr("subprocess.Popen", Popen)
+    monkeypatch.setenv("PYTHONPATH", "/task")
+    monkeypatch.setenv("PYTHONWARNINGS", "error")
+    monkeypatch.setenv("PYTHONUNBUFFERED", "1")
+    launcher.start_server()
+    assert "-E" not in started["args"]
+    assert "PYTHONPATH" not in started["env"]
+    assert "PYTHONWARNINGS" not in started["env"]
+    assert started["env"]["PYTHONUNBUFFERED"] == "1"
+    assert started["env"]["QL_LAUNCHER_SERVER"] == "1"
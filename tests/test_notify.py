@@ -0,0 +1,242 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+import notify
+
+
+class FakeSession:
+    """
+    按顺序返回预设的响应或抛出预设的异常，记录每次请求的方法。
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.methods = []
+
+    def request(self, method, url, **kwargs):
+        self.methods.append(method)
+        outcome = self.outcomes.pop(0) if self.outcomes else 200
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response._content = b'{"code": 0}'
+        return response
+
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(*outcomes):
+        fake = FakeSession(*outcomes)
+        monkeypatch.setattr(notify, "get_session", lambda: fake)
+        return fake
+
+    monkeypatch.setattr(notify, "RETRY_BACKOFF", 0)
+    return install
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    def install(workers):
+        pool = ThreadPoolExecutor(max_workers=workers)
+        monkeypatch.setattr(notify, "_executor", pool)
+        return pool
+
+    return install
+
+
+def test_token_bucket_reserve():
+    bucket = notify.TokenBucket(rate=1, capacity=2)
+    assert bucket.reserve(5) == 0
+    assert bucket.reserve(5) == 0
+    assert bucket.reserve(5) == pytest.approx(1, abs=0.05)
+    # 超过等待上限时不占用令牌
+    assert bucket.reserve(1.5) is None
+    assert bucket.reserve(2.5) == pytest.approx(2, abs=0.05)
+
+
+def test_token_bucket_acquire_gives_up_after_max_wait():
+    bucket = notify.TokenBucket(rate=0.01, capacity=1)
+    assert bucket.acquire(1)
+    start = time.monotonic()
+    assert not bucket.acquire(1)
+    assert time.monotonic() - start < 0.1
+
+
+def test_post_read_timeout_is_not_retried(session):
+    fake = session(requests.ReadTimeout())
+    with pytest.raises(requests.ReadTimeout):
+        notify.http_post("test_retry", "http://example.invalid", data="x")
+    assert fake.methods == ["POST"]
+
+
+def test_get_read_timeout_is_retried(session):
+    fake = session(requests.ReadTimeout(), 200)
+    assert notify.http_get("test_retry", "http://example.invalid").status_code == 200
+    assert fake.methods == ["GET", "GET"]
+
+
+def test_connect_errors_and_server_errors_are_retried(session):
+    fake = session(requests.ConnectTimeout(), requests.ConnectionError(), 503, 200)
+    response = notify.http_post("test_retry", "http://example.invalid", data="x")
+    assert response.status_code == 200
+    assert len(fake.methods) == 4
+
+
+def test_client_errors_are_not_retried(session):
+    fake = session(400)
+    response = notify.http_post("test_retry", "http://example.invalid", data="x")
+    assert response.status_code == 400
+    assert len(fake.methods) == 1
+
+
+def test_rate_limited_channel_does_not_hold_pool_threads(
+    session, executor, monkeypatch
+):
+    session()
+    executor(1)
+    monkeypatch.setitem(notify.CHANNEL_RATE_LIMITS, "test_limited", (2, 1))
+    finished = {}
+
+    def post(channel):
+        def send(title, content):
+            notify.http_post(channel, "http://example.invalid", data=title)
+            finished[title] = time.monotonic()
+
+        return notify.Channel(channel, send, ())
+
+    limited, free = post("test_limited"), post("test_free")
+    jobs = [(limited, f"limited-{i}", "") for i in range(3)] + [(free, "free", "")]
+
+    start = time.monotonic()
+    results = asyncio.run(notify.dispatch(jobs))
+    assert all(result.ok for result in results)
+    # 唯一的线程没有被排队中的渠道占住，不限速的渠道立即完成
+    assert finished["free"] - start < 0.3
+    assert finished["limited-2"] - start == pytest.approx(1, abs=0.3)
+
+
+def test_rate_limit_wait_is_capped(session, executor, monkeypatch):
+    session()
+    executor(2)
+    monkeypatch.setattr(notify, "NOTIFY_RATE_LIMIT_MAX_WAIT", 0.5)
+    monkeypatch.setitem(notify.CHANNEL_RATE_LIMITS, "test_capped", (0.01, 1))
+
+    def send(title, content):
+        notify.http_post("test_capped", "http://example.invalid", data=title)
+
+    channel = notify.Channel("test_capped", send, ())
+    results = asyncio.run(notify.dispatch([(channel, "a", ""), (channel, "b", "")]))
+    assert [result.ok for result in results] == [True, False]
+    assert results[1].error == "RateLimited"
+
+
+def test_concurrent_sends_see_only_their_own_config(isolation_channel):
+    def config(key):
+        return {"TEST_KEY": key, "HITOKOTO": "false"}
+
+    async def send_batch(keys):
+        return await asyncio.gather(
+            *(notify.async_send(key, "c", True, **config(key)) for key in keys)
+        )
+
+    def run(i):
+        if i % 2:
+            return [notify.send(f"sync-{i}", "c", True, **config(f"sync-{i}"))]
+        return asyncio.run(send_batch([f"async-{i}-{j}" for j in range(4)]))
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = [result for batch in pool.map(run, range(100)) for result in batch]
+    assert len(results) == 250
+    assert all(result.ok and result.channels for result in results)
+    assert len(isolation_channel) == 250
+    assert all(title == key for title, key in isolation_channel)
+
+
+def test_call_config_does_not_leak_into_defaults(isolation_channel, monkeypatch):
+    monkeypatch.setitem(notify.push_config.defaults, "TEST_KEY", "default")
+    notify.send("call", "c", HITOKOTO="false", TEST_KEY="override")
+    notify.send("default", "c", HITOKOTO="false")
+    assert isolation_channel == [("call", "override"), ("default", "default")]
+    assert notify.push_config["TEST_KEY"] == "default"
+
+
+def test_ignore_default_config_drops_defaults(isolation_channel, monkeypatch):
+    monkeypatch.setitem(notify.push_config.defaults, "TEST_KEY", "default")
+    result = notify.send("ignored", "c", True, HITOKOTO="false")
+    assert result.channels == []
+    assert isolation_channel == []
+
+
+@pytest.fixture
+def spool(monkeypatch, tmp_path):
+    monkeypatch.setenv("QL_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(notify, "start_drainer", lambda: None)
+    monkeypatch.setattr(notify, "SPOOL_RETRY_MAX_WAIT", 0)
+
+    def rows():
+        conn = notify.open_spool()
+        try:
+            return conn.execute(
+                "SELECT title, config, status, attempts, channels, error FROM spool "
+                "ORDER BY id"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    return rows
+
+
+def test_spool_stores_full_effective_config(isolation_channel, spool, monkeypatch):
+    monkeypatch.setitem(notify.push_config.defaults, "TEST_KEY", "default")
+    notify.send("queued", "c", NOTIFY_SPOOL="true", HITOKOTO="false")
+    [(_, config, status, *_)] = spool()
+    config = json.loads(config)
+    assert status == "pending"
+    assert config["TEST_KEY"] == "default"
+    assert config["NOTIFY_SPOOL"] == "true"
+
+    # 发送进程的环境变量与写入队列的任务不同，仍使用写入时的配置
+    monkeypatch.setitem(notify.push_config.defaults, "TEST_KEY", "drainer")
+    notify.drain()
+    assert isolation_channel == [("queued", "default")]
+    assert spool() == []
+
+
+def test_spool_retries_failed_channels(spool, monkeypatch):
+    calls = []
+
+    def send(title, content):
+        calls.append(title)
+        if len(calls) == 1:
+            raise RuntimeError("rejected")
+
+    monkeypatch.setitem(
+        notify.CHANNELS, "test_spool", notify.Channel("test_spool", send, ("TEST_KEY",))
+    )
+    notify.send("retry", "c", True, NOTIFY_SPOOL="true", TEST_KEY="k", HITOKOTO="false")
+    notify.drain()
+    assert calls == ["retry", "retry"]
+    assert spool() == []
+
+
+def test_drain_marks_broken_row_failed_and_continues(
+    isolation_channel, spool, monkeypatch
+):
+    conn = notify.open_spool()
+    conn.execute(
+        "INSERT INTO spool (title, content, config, mode, created_at) "
+        "VALUES ('broken', 'c', '{', 'true', 0)"
+    )
+    conn.close()
+    notify.send("ok", "c", True, NOTIFY_SPOOL="true", TEST_KEY="k", HITOKOTO="false")
+    notify.drain()
+    [(title, _, status, attempts, _, error)] = spool()
+    assert (title, status, attempts) == ("broken", "failed", 1)
+    assert "JSONDecodeError" in error
+    assert isolation_channel == [("ok", "k")]
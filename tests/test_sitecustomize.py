@@ -0,0 +1,53 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+import notify
+
+
+@pytest.fixture
+def sitecustomize(monkeypatch):
+    # 按文件加载，避免与解释器启动时导入的 sitecustomize 冲突；不执行 bootstrap()
+    monkeypatch.setenv("QL_LAUNCHER_SERVER", "1")
+    path = os.path.join(
+        os.path.dirname(__file__), "..", "shell", "preload", "sitecustomize.py"
+    )
+    spec = importlib.util.spec_from_file_location("ql_sitecustomize", path)
+    module = importlib.util.module_from_spec(spec)
+    # 进程池按模块名 pickle run_account
+    monkeypatch.setitem(sys.modules, spec.name, module)
+    spec.loader.exec_module(module)
+    return module
+
+
+def send_digest(account):
+    result = notify.send(
+        f"account-{account}",
+        "c",
+        True,
+        NOTIFY_DIGEST="true",
+        TEST_KEY="digest",
+        HITOKOTO="false",
+    )
+    return result.queued
+
+
+def test_process_workers_hand_digest_back_to_parent(
+    sitecustomize, isolation_channel, monkeypatch
+):
+    monkeypatch.setenv("TEST_ACCOUNTS", "a&b&c")
+    items = sitecustomize.for_each_account(
+        send_digest, workers=2, env_name="TEST_ACCOUNTS", use_process=True
+    )
+    assert [(item["account"], item["result"]) for item in items] == [
+        ("a", True),
+        ("b", True),
+        ("c", True),
+    ]
+    assert all("notify" not in item for item in items)
+    # 子进程没有发送，三个账号的通知在父进程中合并为一条
+    assert isolation_channel == []
+    notify.flush_digest()
+    assert isolation_channel == [("account-a 等 3 条通知", "digest")]